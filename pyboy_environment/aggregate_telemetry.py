@@ -0,0 +1,91 @@
+import argparse
+import glob
+import json
+import logging
+
+from pyboy_environment.environments.telemetry import QuantileSketch
+
+logging.basicConfig(level=logging.INFO)
+
+
+def read_latest_snapshot(file_path):
+    # Snapshots are cumulative so only the last complete line of each worker's file is needed
+    latest = None
+    with open(file_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                latest = json.loads(line)
+            except json.JSONDecodeError:
+                # A worker may be part way through writing its final line
+                continue
+    return latest
+
+
+def merge_snapshots(snapshots):
+    counters = {}
+    sketches = {}
+    steps_per_second = 0.0
+    for snapshot in snapshots:
+        for name, value in snapshot["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+
+        for name, data in snapshot["sketches"].items():
+            sketch = QuantileSketch.from_dict(data)
+            if name in sketches:
+                sketches[name].merge(sketch)
+            else:
+                sketches[name] = sketch
+
+        steps_per_second += snapshot["steps_per_second"]
+
+    return {
+        "workers": len(snapshots),
+        "counters": counters,
+        "steps_per_second": steps_per_second,
+        "sketches": {name: sketch.summary() for name, sketch in sketches.items()},
+    }
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-t", "--telemetry_path", type=str, required=True)
+
+    parse_args.add_argument("-o", "--output_file", type=str, default=None)
+
+    return parse_args.parse_args()
+
+
+def main():
+    args = get_args()
+
+    telemetry_files = glob.glob(f"{args.telemetry_path}/*.jsonl")
+    logging.info(f"Found {len(telemetry_files)} worker telemetry files")
+
+    snapshots = []
+    for telemetry_file in telemetry_files:
+        snapshot = read_latest_snapshot(telemetry_file)
+        if snapshot is None:
+            logging.warning(f"No telemetry in {telemetry_file}")
+            continue
+
+        logging.info(
+            f"{snapshot['worker_id']}: {snapshot['counters']} {snapshot['steps_per_second']:.1f} steps/s"
+        )
+        snapshots.append(snapshot)
+
+    summary = merge_snapshots(snapshots)
+
+    logging.info(f"Workers: {summary['workers']}")
+    logging.info(f"Counters: {summary['counters']}")
+    logging.info(f"Steps/s: {summary['steps_per_second']:.1f}")
+    for name, sketch in summary["sketches"].items():
+        logging.info(f"{name}: {sketch}")
+
+    if args.output_file is not None:
+        with open(args.output_file, "w", encoding="utf-8") as file:
+            json.dump(summary, file)
+
+
+if __name__ == "__main__":
+    main()
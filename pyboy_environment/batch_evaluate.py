@@ -0,0 +1,183 @@
+"""
+Evaluates every submission in a directory in parallel. Each model runs through evaluate.py - the same
+PokemonBrock(act_freq=24, headless=True) configuration and 10,000 steps - in its own process, against a copy of
+this package with the submission's brock.py in place.
+
+Expected layout - pull_results.py writes the models folder:
+
+    models_path/UPI/models/ALGORITHM-..._actor.pht
+    models_path/UPI/brock.py (optional)
+
+pull_results.py downloads brock.py into this package's tasks folder rather than the UPI folder, so a submission
+without its own brock.py is evaluated with the package's tasks/brock.py.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+
+REPO_PATH = Path(__file__).parent.parent
+
+TASK_PATH = REPO_PATH / "pyboy_environment/environments/pokemon/tasks/brock.py"
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-m", "--models_path", type=str, required=True)
+
+    parse_args.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+
+    # Resumable evaluation through checkpoint_evaluate - 0 runs the plain evaluate.py loop
+    parse_args.add_argument("-c", "--checkpoint_interval", type=int, default=0)
+
+    return parse_args.parse_args()
+
+
+def find_submissions(models_path):
+    submissions = []
+    for upi in sorted(os.listdir(models_path)):
+        model_folder = f"{models_path}/{upi}/models"
+        if not os.path.isdir(model_folder):
+            continue
+
+        model_files = sorted(os.listdir(model_folder))
+        if len(model_files) == 0:
+            logging.warning(f"No model files for UPI: {upi}")
+            continue
+
+        brock_path = f"{models_path}/{upi}/brock.py"
+        if not os.path.isfile(brock_path):
+            logging.info(f"No brock.py for UPI: {upi} - using {TASK_PATH}")
+            brock_path = str(TASK_PATH)
+
+        # Same naming convention as pull_results - actor/critic files share the prefix before "_"
+        model_name = model_files[0].split("_")[0]
+        submissions.append((upi, f"{models_path}/{upi}", model_name, brock_path))
+    return submissions
+
+
+def _source_ignore(models_path):
+    ignore_patterns = shutil.ignore_patterns(".git", "media", "results", "__pycache__")
+    models_path = Path(models_path).resolve()
+
+    def ignore(directory, names):
+        # models_path may live inside the package - never copy the submissions into each other
+        ignored = set(ignore_patterns(directory, names))
+        ignored.update(name for name in names if (Path(directory) / name).resolve() == models_path)
+        return ignored
+
+    return ignore
+
+
+def _copy_source(models_path, model_path, brock_path):
+    # Each submission gets its own copy of this package so its brock.py is the one evaluated
+    source_path = f"{model_path}/src"
+    shutil.rmtree(source_path, ignore_errors=True)
+    shutil.copytree(REPO_PATH, source_path, ignore=_source_ignore(models_path))
+    shutil.copy(
+        brock_path,
+        f"{source_path}/pyboy_environment/environments/pokemon/tasks/brock.py",
+    )
+    return source_path
+
+
+def evaluate_submission(
+    models_path, upi, model_path, model_name, brock_path, checkpoint_interval=0
+):
+    start = time.time()
+    source_path = _copy_source(models_path, model_path, brock_path)
+
+    # Resumable evaluation through checkpoint_evaluate - otherwise the plain evaluate.py loop
+    module = "pyboy_environment.checkpoint_evaluate" if checkpoint_interval > 0 else "pyboy_environment.evaluate"
+    command = [
+        sys.executable,
+        "-m",
+        module,
+        "--upi",
+        upi,
+        "--model_path",
+        model_path,
+        "--model_name",
+        model_name,
+        "--results_path",
+        model_path,
+    ]
+    if checkpoint_interval > 0:
+        command += ["--checkpoint_interval", str(checkpoint_interval)]
+
+    # Each process gets one core - keep the policy network from spawning a thread per core as well
+    env = dict(os.environ, OMP_NUM_THREADS="1", MKL_NUM_THREADS="1", PYTHONPATH=source_path)
+
+    # Run from the copy so its pyboy_environment is imported ahead of any installed one
+    with open(f"{model_path}/evaluate.log", "w", encoding="utf-8") as log:
+        subprocess.run(
+            command, stdout=log, stderr=subprocess.STDOUT, cwd=source_path, env=env, check=True
+        )
+
+    with open(f"{model_path}/results.json", "r", encoding="utf-8") as file:
+        results = json.load(file)
+
+    return {
+        "upi": upi,
+        "model_name": model_name,
+        "status": "complete",
+        "duration": time.time() - start,
+        "results": results,
+    }
+
+
+def run(models_path, workers, checkpoint_interval=0):
+    submissions = find_submissions(models_path)
+    logging.info(f"Evaluating {len(submissions)} submissions with {workers} workers")
+
+    summary = []
+    # Each evaluation is its own process - the threads only wait on them
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                evaluate_submission,
+                models_path,
+                upi,
+                model_path,
+                model_name,
+                brock_path,
+                checkpoint_interval,
+            ): upi
+            for upi, model_path, model_name, brock_path in submissions
+        }
+
+        for future in as_completed(futures):
+            upi = futures[future]
+            try:
+                result = future.result()
+                logging.info(f"Finished {upi} in {result['duration']:.1f}s")
+            except Exception as error:
+                logging.error(f"Evaluation failed for {upi}: {error}")
+                result = {"upi": upi, "status": "failed", "error": str(error)}
+            summary.append(result)
+
+    summary = sorted(summary, key=lambda result: result["upi"])
+    with open(f"{models_path}/summary.json", "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=4)
+
+    return summary
+
+
+def main():
+    args = get_args()
+
+    run(args.models_path, args.workers, args.checkpoint_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Resumable version of evaluate.py. The evaluation loop and final results are identical, but every
+checkpoint_interval steps the pickled environment (see PyboyEnvironment.__getstate__), current state and RNG
+states are written to a checkpoint. Progress stats are appended to progress.jsonl through a buffered file that is
+flushed with each checkpoint. Re-running the same command resumes from the latest checkpoint - as long as it was
+written for the same UPI, model name and model files.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import random
+
+import numpy as np
+
+import cares_reinforcement_learning.util.configurations as configurations
+from cares_reinforcement_learning.util.network_factory import NetworkFactory
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+
+logging.basicConfig(level=logging.INFO)
+
+CHECKPOINT_VERSION = 2
+CHECKPOINT_FILE = "checkpoint.pkl"
+PROGRESS_FILE = "progress.jsonl"
+
+# Bytes buffered before progress lines are written out between checkpoints
+PROGRESS_BUFFER_SIZE = 1 << 16
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("--upi", type=str, required=True)
+
+    parse_args.add_argument("-p", "--model_path", type=str, required=True)
+
+    parse_args.add_argument("-n", "--model_name", type=str, required=True)
+
+    parse_args.add_argument("-r", "--results_path", type=str, required=True)
+
+    parse_args.add_argument("-c", "--checkpoint_interval", type=int, default=500)
+
+    return parse_args.parse_args()
+
+
+def _get_rng_states():
+    states = {"random": random.getstate(), "numpy": np.random.get_state()}
+    try:
+        import torch
+
+        states["torch"] = torch.get_rng_state()
+    except ImportError:
+        pass
+    return states
+
+
+def _set_rng_states(states):
+    random.setstate(states["random"])
+    np.random.set_state(states["numpy"])
+    if "torch" in states:
+        import torch
+
+        torch.set_rng_state(states["torch"])
+
+
+def model_identity(upi, model_file_path, model_file_name):
+    # What a checkpoint was written for - resuming another model's episode would silently corrupt its results
+    model_files = sorted(
+        glob.glob(f"{model_file_path}/models/{model_file_name}_*")
+        + glob.glob(f"{model_file_path}/{model_file_name}_*")
+    )
+
+    hashes = {}
+    for file_path in model_files:
+        with open(file_path, "rb") as file:
+            hashes[os.path.basename(file_path)] = hashlib.sha256(file.read()).hexdigest()
+
+    return {"upi": upi, "model_name": model_file_name, "model_files": hashes}
+
+
+def save_checkpoint(results_path, env, step, state, identity=None):
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "identity": identity,
+        "step": step,
+        "state": state,
+        "rng": _get_rng_states(),
+        "env": env.__getstate__(),
+    }
+
+    # Write then rename so a crash mid-write leaves the previous checkpoint intact
+    checkpoint_path = f"{results_path}/{CHECKPOINT_FILE}"
+    with open(f"{checkpoint_path}.tmp", "wb") as file:
+        pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
+
+
+def load_checkpoint(results_path, env, identity=None):
+    checkpoint_path = f"{results_path}/{CHECKPOINT_FILE}"
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with open(checkpoint_path, "rb") as file:
+        checkpoint = pickle.load(file)
+
+    if checkpoint["version"] != CHECKPOINT_VERSION:
+        logging.warning(f"Ignoring checkpoint version {checkpoint['version']}")
+        return None
+
+    if checkpoint["identity"] != identity:
+        written_for = checkpoint["identity"] or {}
+        logging.warning(
+            f"Ignoring checkpoint written for a different model: "
+            f"{written_for.get('upi')}/{written_for.get('model_name')}"
+        )
+        return None
+
+    # Task fields such as PokemonBrock.previous_reward come back with the emulator
+    env.restore(checkpoint["env"])
+    _set_rng_states(checkpoint["rng"])
+
+    return checkpoint["step"], checkpoint["state"]
+
+
+def _truncate_progress(progress_path, step):
+    # Drop any progress written after the checkpoint being resumed from
+    if not os.path.exists(progress_path):
+        return
+
+    with open(progress_path, "r", encoding="utf-8") as file:
+        lines = [line for line in file if line.strip()]
+
+    kept = []
+    for line in lines:
+        try:
+            if json.loads(line)["step"] <= step:
+                kept.append(line)
+        except json.JSONDecodeError:
+            break
+
+    with open(progress_path, "w", encoding="utf-8") as file:
+        file.writelines(kept)
+
+
+def run_agent(env, agent, num_episodes, results_path, checkpoint_interval=500, identity=None):
+    progress_path = f"{results_path}/{PROGRESS_FILE}"
+
+    start_step = 0
+    state = env.reset()
+
+    resumed = load_checkpoint(results_path, env, identity)
+    if resumed is not None:
+        last_step, state = resumed
+        start_step = last_step + 1
+        logging.info(f"Resuming from step: {start_step}")
+        _truncate_progress(progress_path, last_step)
+    elif os.path.exists(progress_path):
+        os.remove(progress_path)
+
+    step = start_step - 1
+    with open(
+        progress_path, "a", encoding="utf-8", buffering=PROGRESS_BUFFER_SIZE
+    ) as progress:
+        for step in range(start_step, num_episodes):
+            if step % 100 == 0:
+                logging.info(f"Step: {step}")
+                stats = env.prior_game_stats
+                progress.write(
+                    json.dumps(
+                        {
+                            "step": step,
+                            "location": stats["location"],
+                            "badges": stats["badges"],
+                            "caught_pokemon": stats["caught_pokemon"],
+                            "seen_pokemon": stats["seen_pokemon"],
+                            "levels": stats["levels"],
+                            "xp": stats["xp"],
+                        }
+                    )
+                    + "\n"
+                )
+
+            action = agent.select_action_from_policy(state, evaluation=True)
+            next_state, reward, done, _ = env.step(action)
+            state = next_state
+            if done:
+                state = env.reset()
+
+            if checkpoint_interval > 0 and (step + 1) % checkpoint_interval == 0:
+                progress.flush()
+                save_checkpoint(results_path, env, step, state, identity)
+
+    final_stats = env._generate_game_stats()
+
+    final_stats["actions"] = step
+
+    logging.info(f"Final Stats: {final_stats}")
+
+    with open(f"{results_path}/results.json", "w", encoding="utf-8") as file:
+        json.dump(final_stats, file)
+
+    # The run is complete - a later invocation should start a fresh evaluation
+    checkpoint_path = f"{results_path}/{CHECKPOINT_FILE}"
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+
+def run(results_path, model_file_path, model_file_name, checkpoint_interval=500, upi=None):
+    algorithm = model_file_name.split("-")[0]
+
+    class_ = getattr(configurations, f"{algorithm}Config")
+    algorithm_config = class_()
+
+    network_factory = NetworkFactory()
+
+    brock_task = PokemonBrock(act_freq=24, headless=True)
+
+    agent = network_factory.create_network(
+        brock_task.observation_space, brock_task.action_num, algorithm_config
+    )
+
+    agent.load_models(model_file_path, model_file_name)
+
+    identity = model_identity(upi, model_file_path, model_file_name)
+    run_agent(brock_task, agent, 10000, results_path, checkpoint_interval, identity)
+
+
+def main():
+    args = get_args()
+
+    run(
+        args.results_path,
+        args.model_path,
+        args.model_name,
+        args.checkpoint_interval,
+        args.upi,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,29 @@ import argparse
 import glob
 import json
 import logging
-from functools import cmp_to_key
+import os
 
 import numpy as np
 
 logging.basicConfig(level=logging.INFO)
 
+INDEX_FILE = ".results_index.json"
+
+SUMMARY_DTYPE = np.dtype(
+    [
+        ("upi", "U64"),
+        ("badges", np.int64),
+        ("actions", np.int64),
+        ("caught_pokemon", np.int64),
+        ("seen_pokemon", np.int64),
+        ("levels", np.float64),
+        ("xp", np.float64),
+    ]
+)
+
 
 def compare_performance(results_one, results_two):
+    # Reference ordering for the competition - rank_results must agree with it, see tests/test_compare_results.py
     # Tier 1
     if results_one["badges"] > results_two["badges"]:
         return -1
@@ -55,33 +70,110 @@ def get_args():
     return parse_args.parse_args()
 
 
+def summarise_result(result):
+    # The tiered criteria of compare_performance, with the means computed once per result
+    return {
+        "badges": result["badges"],
+        "actions": result["actions"],
+        "caught_pokemon": result["caught_pokemon"],
+        "seen_pokemon": result["seen_pokemon"],
+        "levels": float(np.mean(result["levels"])),
+        "xp": float(np.mean(result["xp"])),
+    }
+
+
+def load_summaries(results_path):
+    # Summaries are cached in an index keyed on each results file's size and modification time
+    index_path = f"{results_path}/{INDEX_FILE}"
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as file:
+            index = json.load(file)
+
+    updated_index = {}
+    for result_directory in sorted(glob.glob(f"{results_path}/*")):
+        result_file = f"{result_directory}/results.json"
+        if not os.path.isfile(result_file):
+            continue
+
+        upi = result_directory.split("/")[-1]
+        stat = os.stat(result_file)
+        entry = index.get(upi)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            updated_index[upi] = entry
+            continue
+
+        logging.info(f"Reading results for UPI: {upi}")
+        with open(result_file, "r", encoding="utf-8") as file:
+            result = json.load(file)
+
+        updated_index[upi] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "summary": summarise_result(result),
+        }
+
+    if updated_index != index:
+        with open(f"{index_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(updated_index, file)
+        os.replace(f"{index_path}.tmp", index_path)
+
+    return {upi: entry["summary"] for upi, entry in updated_index.items()}
+
+
+def rank_results(summaries):
+    results = np.array(
+        [
+            (
+                upi,
+                summary["badges"],
+                summary["actions"],
+                summary["caught_pokemon"],
+                summary["seen_pokemon"],
+                summary["levels"],
+                summary["xp"],
+            )
+            for upi, summary in summaries.items()
+        ],
+        dtype=SUMMARY_DTYPE,
+    )
+
+    # Actions only break ties between results that both have badges - same as compare_performance
+    actions = np.where(results["badges"] > 0, results["actions"], 0)
+
+    # lexsort sorts ascending on the last key first, so negate for descending
+    order = np.lexsort(
+        (
+            -results["xp"],
+            -results["levels"],
+            -results["seen_pokemon"],
+            -results["caught_pokemon"],
+            -actions,
+            -results["badges"],
+        )
+    )
+    return results[order]
+
+
 def main():
     args = get_args()
 
     results_path = args.results_path
 
-    result_directories = glob.glob(f"{results_path}/*")
-    logging.info(f"Found {len(result_directories)} results directories")
-    logging.info(f"Results directories: {result_directories}")
-
     logging.info(f"Comparing results in {results_path}")
 
-    results = []
-    for result_directory in result_directories:
-        upi = result_directory.split("/")[-1]
-        logging.info(f"Reading results for UPI: {upi}")
-
-        with open(f"{result_directory}/results.json", "r", encoding="utf-8") as file:
-            result = json.load(file)
-            result["upi"] = upi
-
-            results.append(result)
+    summaries = load_summaries(results_path)
+    logging.info(f"Found {len(summaries)} results")
 
-    results = sorted(results, key=cmp_to_key(compare_performance))
+    results = rank_results(summaries)
 
     for i, result in enumerate(results):
         logging.info(
-            f"Rank {i + 1}: {result['upi']} - Badges: {result['badges']} Caught: {result['caught_pokemon']} Seen: {result['seen_pokemon']} Levels: {np.mean(result['levels'])} XP: {np.mean(result['xp'])}"
+            f"Rank {i + 1}: {result['upi']} - Badges: {result['badges']} Caught: {result['caught_pokemon']} Seen: {result['seen_pokemon']} Levels: {result['levels']} XP: {result['xp']}"
         )
 
 
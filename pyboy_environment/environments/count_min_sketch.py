@@ -0,0 +1,90 @@
+"""
+Fixed memory visit counts for count-based exploration bonuses.
+
+Keys are tuples of ints hashed into a depth x width table of counters, one multiply-shift hash per row, so
+memory stays constant however many states are visited. A count is the minimum over the rows - never below the
+true count and, with high probability, close to it. Counts can be decayed so old visits fade, and sketches built
+with the same shape and seed can be merged across workers.
+"""
+
+import numpy as np
+
+DEFAULT_WIDTH = 1 << 16
+DEFAULT_DEPTH = 4
+
+# Drops the sign and keeps the hash inside uint64
+HASH_MASK = (1 << 64) - 1
+
+
+class CountMinSketch:
+    def __init__(
+        self,
+        width: int = DEFAULT_WIDTH,
+        depth: int = DEFAULT_DEPTH,
+        decay: float = 1.0,
+        decay_interval: int = 0,
+        seed: int = 0,
+    ) -> None:
+        if width < 2 or width & (width - 1) != 0:
+            raise ValueError(f"Sketch width must be a power of two: {width}")
+
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+
+        # Every decay_interval updates all counts are multiplied by decay - 0 disables decay
+        self.decay = decay
+        self.decay_interval = decay_interval
+
+        rng = np.random.default_rng(seed)
+        # Odd multipliers for multiply-shift hashing - the top log2(width) bits of the product pick the column
+        self.multipliers = rng.integers(0, 1 << 63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.shift = np.uint64(64 - (width.bit_length() - 1))
+        self.rows = np.arange(depth)
+
+        self.counts = np.zeros((depth, width), dtype=np.float32)
+        self.updates = 0
+
+    def _columns(self, key: tuple) -> np.ndarray:
+        # hash() of a tuple of ints does not depend on PYTHONHASHSEED, so workers agree on the columns
+        key_hash = np.uint64(hash(key) & HASH_MASK)
+        return (self.multipliers * key_hash) >> self.shift
+
+    def update(self, key: tuple, count: float = 1.0) -> float:
+        # Adds count to key and returns its new estimate
+        columns = self._columns(key)
+        self.counts[self.rows, columns] += count
+
+        self.updates += 1
+        if self.decay_interval > 0 and self.updates % self.decay_interval == 0:
+            self.counts *= self.decay
+
+        return float(self.counts[self.rows, columns].min())
+
+    def query(self, key: tuple) -> float:
+        return float(self.counts[self.rows, self._columns(key)].min())
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Only sketches with the same width, depth and seed can be merged")
+
+        self.counts += other.counts
+        self.updates += other.updates
+
+    def save(self, file_path: str) -> None:
+        np.savez_compressed(
+            file_path,
+            counts=self.counts,
+            shape=np.array([self.width, self.depth, self.seed, self.updates]),
+            decay=np.array([self.decay, self.decay_interval]),
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> "CountMinSketch":
+        with np.load(file_path) as data:
+            width, depth, seed, updates = (int(value) for value in data["shape"])
+            decay, decay_interval = data["decay"]
+            sketch = cls(width, depth, float(decay), int(decay_interval), seed)
+            sketch.counts[:] = data["counts"]
+            sketch.updates = updates
+        return sketch
@@ -0,0 +1,60 @@
+"""
+Preallocated frame stack for giving agents temporal context.
+
+Observations are written once into an oversized buffer and the last K are returned as a contiguous slice, so
+no per-step concatenation or copies are needed. When the write position reaches the end of the buffer the
+last K-1 observations are moved to the front, which amortises to well under one extra copy per step.
+"""
+
+import numpy as np
+
+# Buffer length as a multiple of the stack size - larger trades memory for fewer roll-overs
+CAPACITY_MULTIPLE = 8
+
+
+class FrameStack:
+    def __init__(self, size: int, capacity_multiple: int = CAPACITY_MULTIPLE) -> None:
+        if size < 1:
+            raise ValueError(f"Frame stack size must be positive: {size}")
+
+        self.size = size
+        self.capacity = size * max(capacity_multiple, 2)
+
+        # Allocated on the first push once the observation shape is known
+        self.buffer = None
+        self.position = 0
+
+    def clear(self) -> None:
+        if self.buffer is not None:
+            self.buffer[: self.size].fill(0)
+        # Index of the newest observation - the zeroed slots before it pad the first stack of an episode
+        self.position = self.size - 1
+
+    def push(self, observation: np.ndarray) -> None:
+        observation = np.asarray(observation)
+        if self.buffer is None:
+            self.buffer = np.zeros(
+                (self.capacity,) + observation.shape, dtype=observation.dtype
+            )
+            self.position = self.size - 1
+        elif observation.shape != self.buffer.shape[1:]:
+            raise ValueError(
+                f"Observation shape {observation.shape} does not match the stack shape {self.buffer.shape[1:]}"
+            )
+
+        self.position += 1
+        if self.position == self.capacity:
+            # Roll the newest K-1 observations to the front of the buffer
+            self.buffer[: self.size - 1] = self.buffer[self.capacity - self.size + 1 :]
+            self.position = self.size - 1
+
+        self.buffer[self.position] = observation
+
+    def view(self) -> np.ndarray:
+        # Oldest first, shape (K, *observation_shape) - only valid until the next push
+        if self.buffer is None:
+            raise ValueError("Frame stack is empty - push an observation first")
+
+        stack = self.buffer[self.position - self.size + 1 : self.position + 1]
+        stack.flags.writeable = False
+        return stack
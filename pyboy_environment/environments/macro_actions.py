@@ -0,0 +1,93 @@
+"""
+Macro actions run a scripted sequence of button presses inside a single environment step.
+
+A macro is a list of segments. Each segment is a per-frame schedule of WindowEvents followed by a reward
+calculation, so the step returns the sum of the rewards of every segment that was executed.
+"""
+
+from pyboy.utils import WindowEvent
+
+
+class ButtonSchedule:
+    def __init__(self, frames: int, events: list[tuple[int, WindowEvent]]) -> None:
+        self.frames = frames
+        # (frame, event) pairs - events on the same frame are sent in the given order
+        self.events = sorted(events, key=lambda event: event[0])
+
+        if self.events and self.events[-1][0] > frames:
+            raise ValueError(
+                f"Schedule event on frame {self.events[-1][0]} is beyond its length of {frames} frames"
+            )
+
+
+class MacroAction:
+    def __init__(self, name: str, segments: list[ButtonSchedule]) -> None:
+        self.name = name
+        self.segments = segments
+
+    @property
+    def frames(self) -> int:
+        return sum(segment.frames for segment in self.segments)
+
+    def __repr__(self) -> str:
+        return f"MacroAction({self.name}, segments={len(self.segments)}, frames={self.frames})"
+
+
+def press_and_release(
+    press: WindowEvent, release: WindowEvent, hold_frames: int, frames: int
+) -> ButtonSchedule:
+    return ButtonSchedule(frames, [(0, press), (hold_frames, release)])
+
+
+def walk_tiles(
+    name: str,
+    press: WindowEvent,
+    release: WindowEvent,
+    tiles: int,
+    frames_per_tile: int = 16,
+) -> MacroAction:
+    # One segment per tile so the reward is still evaluated on every tile walked
+    return MacroAction(
+        name,
+        [
+            press_and_release(press, release, frames_per_tile // 2, frames_per_tile)
+            for _ in range(tiles)
+        ],
+    )
+
+
+def mash_button(
+    name: str,
+    press: WindowEvent,
+    release: WindowEvent,
+    presses: int,
+    interval: int = 8,
+) -> MacroAction:
+    # e.g. advancing through text boxes with repeated A presses
+    return MacroAction(
+        name,
+        [press_and_release(press, release, interval // 2, interval) for _ in range(presses)],
+    )
+
+
+def run_jump(
+    name: str,
+    run_press: WindowEvent,
+    run_release: WindowEvent,
+    jump_press: WindowEvent,
+    jump_release: WindowEvent,
+    run_up_frames: int = 12,
+    jump_frames: int = 24,
+) -> MacroAction:
+    # Hold the run button throughout and the jump button for the length of the jump
+    frames = run_up_frames + jump_frames
+    schedule = ButtonSchedule(
+        frames,
+        [
+            (0, run_press),
+            (run_up_frames, jump_press),
+            (frames, jump_release),
+            (frames, run_release),
+        ],
+    )
+    return MacroAction(name, [schedule])
@@ -14,6 +14,8 @@ import numpy as np
 from pyboy.utils import WindowEvent
 
 from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
+from pyboy_environment.environments.mario.mario_stats import decode_game_stats
+from pyboy_environment.environments.macro_actions import MacroAction
 
 
 class MarioEnvironment(PyboyEnvironment, metaclass=ABCMeta):
@@ -24,8 +26,12 @@ class MarioEnvironment(PyboyEnvironment, metaclass=ABCMeta):
         release_button: list[WindowEvent],
         emulation_speed: int = 0,
         headless: bool = False,
+        macro_actions: list[MacroAction] | None = None,
     ) -> None:
 
+        # Deltas in the decoded stats are relative to the prior step
+        self.prior_game_stats = None
+
         super().__init__(
             task="mario",
             rom_name="SuperMarioLand.gb",
@@ -36,14 +42,24 @@ class MarioEnvironment(PyboyEnvironment, metaclass=ABCMeta):
             release_button=release_button,
             emulation_speed=emulation_speed,
             headless=headless,
+            macro_actions=macro_actions,
         )
 
+    def reset(self) -> np.ndarray:
+        # Start the velocity and progress deltas fresh each episode
+        self.prior_game_stats = None
+        return super().reset()
+
     def _get_state(self) -> np.ndarray:
         # TODO parameter as to whether to flatten this view or not
         # TODO image based being frame or game area frame...
         return self.game_area().flatten().tolist()
 
     def _generate_game_stats(self) -> dict[str, int]:
+        return decode_game_stats(self.pyboy.memory, self.prior_game_stats)
+
+    def _generate_legacy_game_stats(self) -> dict[str, int]:
+        # Per-address reads kept as the reference for mario_stats benchmarking
         return {
             "lives": self._get_lives(),
             "score": self._get_score(),
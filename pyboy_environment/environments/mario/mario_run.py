@@ -1,4 +1,3 @@
-import logging
 from functools import cached_property
 from typing import Dict, List
 
@@ -6,6 +5,7 @@ import numpy as np
 from pyboy.utils import WindowEvent
 
 from pyboy_environment.environments.mario.mario_environment import MarioEnvironment
+from pyboy_environment.environments.macro_actions import MacroAction
 
 
 class MarioRun(MarioEnvironment):
@@ -14,6 +14,7 @@ class MarioRun(MarioEnvironment):
         act_freq: int,
         emulation_speed: int = 0,
         headless: bool = False,
+        macro_actions: List[MacroAction] | None = None,
     ) -> None:
 
         valid_actions: List[WindowEvent] = [
@@ -40,6 +41,7 @@ class MarioRun(MarioEnvironment):
             release_button=release_button,
             emulation_speed=emulation_speed,
             headless=headless,
+            macro_actions=macro_actions,
         )
 
         self.max_level_progress = 0
@@ -62,7 +64,8 @@ class MarioRun(MarioEnvironment):
 
     @cached_property
     def action_num(self) -> int:
-        return len(self.valid_actions)
+        # One toggle per button followed by one per macro action
+        return len(self.valid_actions) + len(self.macro_actions)
 
     def sample_action(self) -> np.ndarray:
         action = []
@@ -70,16 +73,28 @@ class MarioRun(MarioEnvironment):
             action.append(np.random.rand())
         return action
 
+    def _decode_macro_action(self, action: List[float]) -> MacroAction | None:
+        # The strongest macro toggle above 0.5 takes over the whole step
+        macro_toggles = action[len(self.valid_actions) :]
+        if len(macro_toggles) == 0 or max(macro_toggles) < 0.5:
+            return None
+        return self.macro_actions[int(np.argmax(macro_toggles))]
+
+    def _run_macro_action(self, macro_action: MacroAction) -> tuple[float, bool, bool]:
+        # Macros start from a clean controller rather than whatever the toggles left held
+        for release in self.release_button:
+            self.pyboy.send_input(release)
+        return super()._run_macro_action(macro_action)
+
     def _run_action_on_emulator(self, action: List[float]) -> None:
         # Toggles the buttons being on or off
-        for i, toggle in enumerate(action):
+        for i, toggle in enumerate(action[: len(self.valid_actions)]):
             if toggle >= 0.5:
                 self.pyboy.send_input(self.valid_actions[i])
             else:
                 self.pyboy.send_input(self.release_button[i])
 
-        for i in range(self.act_freq):
-            self.pyboy.tick()
+        self._tick_frames(self.act_freq)
 
     def _calculate_reward(self, new_state: Dict[str, int]) -> float:
         reward_stats = {
@@ -88,11 +103,7 @@ class MarioRun(MarioEnvironment):
             "score_reward": self._score_reward(new_state),
         }
 
-        reward_total: int = 0
-        for name, reward in reward_stats.items():
-            logging.debug(f"{name} reward: {reward}")
-            reward_total += reward
-        return reward_total
+        return self._record_rewards(reward_stats)
 
     def _position_reward(self, new_state: Dict[str, int]) -> int:
         delta_distance = new_state["x_position"] - self.max_level_progress
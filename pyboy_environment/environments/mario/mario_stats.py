@@ -0,0 +1,139 @@
+"""
+Decodes the Super Mario Land game stats from a handful of contiguous memory reads.
+
+The per-address helpers on MarioEnvironment issue one read per value, parse the timer through strings and
+go through the PyBoy game wrapper for the score. This decoder slices each memory region once per step and
+derives the same values with integer arithmetic.
+
+https://datacrystal.tcrf.net/wiki/Super_Mario_Land/RAM_map
+"""
+
+import argparse
+import logging
+import timeit
+
+# Row 1 of the background tilemap holds the HUD - score, world/stage and time digits
+HUD_START = 0x9820
+HUD_END = 0x9834
+HUD_BLANK_TILE = 0x2C
+
+SCORE_OFFSET = 0x9820 - HUD_START
+SCORE_DIGITS = 6
+WORLD_OFFSET = 0x982C - HUD_START
+STAGE_OFFSET = 0x982E - HUD_START
+TIME_OFFSET = 0x9831 - HUD_START
+TIME_DIGITS = 3
+
+LEVEL_BLOCK = 0xC0AB
+DEAD_JUMP_TIMER = 0xC0AC
+MARIO_X = 0xC202
+LIVES = 0xDA15
+
+# High RAM from the scroll shadow up to the coin counter
+HRAM_START = 0xFFA4
+HRAM_END = 0xFFFB
+
+SCX_OFFSET = 0xFFA4 - HRAM_START
+DEAD_TIMER_OFFSET = 0xFFA6 - HRAM_START
+GAME_OVER_OFFSET = 0xFFB3 - HRAM_START
+COINS_OFFSET = 0xFFFA - HRAM_START
+
+GAME_OVER = 0x39
+
+
+def _decode_digits(tiles: list[int], start: int, length: int) -> int:
+    number = 0
+    for tile in tiles[start : start + length]:
+        number *= 10
+        if tile != HUD_BLANK_TILE:
+            number += tile
+    return number
+
+
+def decode_game_stats(memory, prior_stats: dict[str, int] | None = None) -> dict[str, int]:
+    hud = memory[HUD_START:HUD_END]
+    level = memory[LEVEL_BLOCK : DEAD_JUMP_TIMER + 1]
+    hram = memory[HRAM_START:HRAM_END]
+
+    # Same fine scroll correction as MarioEnvironment._get_x_position
+    fine_scroll = (hram[SCX_OFFSET] - 7) % 16
+    if fine_scroll == 0:
+        fine_scroll = 16
+    x_position = level[0] * 16 + fine_scroll + memory[MARIO_X]
+
+    # Deltas are taken against the prior step so decoding twice in one step is harmless
+    if prior_stats is None:
+        prior_x_position = x_position
+        max_x_position = x_position
+    else:
+        prior_x_position = prior_stats["x_position"]
+        max_x_position = prior_stats["max_x_position"]
+
+    dead_timer = hram[DEAD_TIMER_OFFSET]
+    dead_jump_timer = level[1]
+
+    return {
+        "lives": memory[LIVES],
+        "score": _decode_digits(hud, SCORE_OFFSET, SCORE_DIGITS),
+        "coins": hram[COINS_OFFSET],
+        "stage": hud[STAGE_OFFSET],
+        "world": hud[WORLD_OFFSET],
+        "x_position": x_position,
+        "time": _decode_digits(hud, TIME_OFFSET, TIME_DIGITS),
+        "dead_timer": dead_timer,
+        "dead_jump_timer": dead_jump_timer,
+        "game_over": hram[GAME_OVER_OFFSET] == GAME_OVER,
+        "is_dead": dead_timer != 0 or dead_jump_timer != 0,
+        "x_velocity": x_position - prior_x_position,
+        "max_x_position": max(max_x_position, x_position),
+        "progress_delta": max(0, x_position - max_x_position),
+    }
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-s", "--steps", type=int, default=1000)
+
+    parse_args.add_argument("-f", "--act_freq", type=int, default=6)
+
+    return parse_args.parse_args()
+
+
+def main():
+    # Benchmarks the decoder against the per-address helpers and reports any disagreement between the two
+    from pyboy_environment.environments.mario.mario_run import MarioRun
+
+    logging.basicConfig(level=logging.INFO)
+
+    args = get_args()
+
+    env = MarioRun(act_freq=args.act_freq, headless=True)
+    env.reset()
+
+    legacy_time = 0.0
+    decoder_time = 0.0
+    mismatches = {}
+    for _ in range(args.steps):
+        env.step(env.sample_action())
+
+        start = timeit.default_timer()
+        legacy = env._generate_legacy_game_stats()
+        legacy_time += timeit.default_timer() - start
+
+        start = timeit.default_timer()
+        decoded = decode_game_stats(env.pyboy.memory, env.prior_game_stats)
+        decoder_time += timeit.default_timer() - start
+
+        for key, value in legacy.items():
+            if decoded[key] != value:
+                mismatches[key] = mismatches.get(key, 0) + 1
+
+    logging.info(f"Legacy stats: {1e6 * legacy_time / args.steps:.2f} us/step")
+    logging.info(f"Decoded stats: {1e6 * decoder_time / args.steps:.2f} us/step")
+    logging.info(f"Speed up: {legacy_time / decoder_time:.1f}x")
+    logging.info(f"Mismatched steps per stat: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
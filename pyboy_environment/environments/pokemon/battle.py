@@ -0,0 +1,102 @@
+"""
+Battle state decoded only while a battle is running.
+
+The enemy (wEnemyMon, 0xCFE5) and active player (wBattleMon, 0xD014) battle structs sit next to each other in
+WRAM, so while wIsInBattle is set both are decoded from a single slice into a fixed-layout array. Outside battle
+the flag is the only read and a shared zero block is returned.
+
+https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/ram/wram.asm
+"""
+
+import numpy as np
+
+IN_BATTLE = 0xD057
+
+ENEMY_MON = 0xCFE5
+BATTLE_MON = 0xD014
+BATTLE_STRUCT_SIZE = 29
+
+BATTLE_START = ENEMY_MON
+BATTLE_END = BATTLE_MON + BATTLE_STRUCT_SIZE
+
+# (name, offset into the battle struct, size in bytes) - words are big endian
+STRUCT_FIELDS = (
+    ("species", 0, 1),
+    ("hp", 1, 2),
+    ("status", 4, 1),
+    ("type1", 5, 1),
+    ("type2", 6, 1),
+    ("move1", 8, 1),
+    ("move2", 9, 1),
+    ("move3", 10, 1),
+    ("move4", 11, 1),
+    ("level", 14, 1),
+    ("max_hp", 15, 2),
+    ("attack", 17, 2),
+    ("defense", 19, 2),
+    ("speed", 21, 2),
+    ("special", 23, 2),
+    ("pp1", 25, 1),
+    ("pp2", 26, 1),
+    ("pp3", 27, 1),
+    ("pp4", 28, 1),
+)
+
+# Layout of the decoded array - the battle type followed by the enemy then the player fields
+BATTLE_FIELDS = ("battle_type",) + tuple(
+    f"{side}_{name}" for side in ("enemy", "player") for name, _, _ in STRUCT_FIELDS
+)
+
+# The top two bits of a PP byte count PP Ups
+PP_MASK = 0x3F
+
+
+def _struct_indices(start: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    high = []
+    low = []
+    masks = []
+    for name, offset, size in STRUCT_FIELDS:
+        if size == 2:
+            high.append(start + offset)
+            low.append(start + offset + 1)
+        else:
+            # One byte fields read a high byte of zero from the padding slot
+            high.append(-1)
+            low.append(start + offset)
+        masks.append(PP_MASK if name.startswith("pp") else 0xFF)
+    return np.array(high), np.array(low), np.array(masks)
+
+
+def _build_indices() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    enemy = _struct_indices(ENEMY_MON - BATTLE_START)
+    player = _struct_indices(BATTLE_MON - BATTLE_START)
+    return tuple(np.concatenate([e, p]) for e, p in zip(enemy, player))
+
+
+HIGH_INDICES, LOW_INDICES, LOW_MASKS = _build_indices()
+
+
+class BattleDecoder:
+    def __init__(self) -> None:
+        # Raw battle structs plus one trailing zero byte that one byte fields read as their high byte
+        self.raw = np.zeros(BATTLE_END - BATTLE_START + 1, dtype=np.uint16)
+
+        self.state = np.zeros(len(BATTLE_FIELDS), dtype=np.float32)
+
+        self.zeros = np.zeros(len(BATTLE_FIELDS), dtype=np.float32)
+        self.zeros.flags.writeable = False
+
+    def decode(self, memory, copy: bool = True) -> np.ndarray:
+        # copy=False returns buffers owned by the decoder - the shared zeros outside battle are read-only
+        battle_type = memory[IN_BATTLE]
+        if battle_type == 0:
+            return self.zeros.copy() if copy else self.zeros
+
+        self.raw[:-1] = memory[BATTLE_START:BATTLE_END]
+
+        values = self.state[1:]
+        values[:] = (self.raw[HIGH_INDICES] << 8) | (self.raw[LOW_INDICES] & LOW_MASKS)
+        # 0xFF marks a lost battle - keep the type signed so it stays distinct from wild (1) and trainer (2)
+        self.state[0] = -1 if battle_type == 0xFF else battle_type
+
+        return self.state.copy() if copy else self.state
@@ -0,0 +1,132 @@
+"""
+Path distances for shaping rewards.
+
+Each map's walkable grid is built once from the map's block data and the tileset collision list and cached by
+map_id. Distance fields are computed once per (map, target set) with a multi-target breadth first search that
+grows the whole frontier per NumPy operation. A step's shaping reward is then one array lookup. Grids and fields
+can be saved to a compressed .npz so later runs start warm. Each grid is stored with a signature of the map data it
+was built from - dimensions, tileset pointers and a hash of the block ids - and is rebuilt when they differ.
+"""
+
+import logging
+import os
+
+import numpy as np
+
+# Cells that cannot reach any target
+UNREACHABLE = -1
+
+
+def distance_field(walkable: np.ndarray, targets: list[tuple[int, int]]) -> np.ndarray:
+    # Steps from every cell to the nearest (x, y) target, moving through walkable cells only
+    height, width = walkable.shape
+    distances = np.full((height, width), UNREACHABLE, dtype=np.int32)
+
+    # Targets are seeded even if not walkable themselves - doors and warps often are not in the collision list
+    frontier = np.zeros((height, width), dtype=bool)
+    for x, y in targets:
+        if 0 <= y < height and 0 <= x < width:
+            frontier[y, x] = True
+
+    distance = 0
+    while frontier.any():
+        distances[frontier] = distance
+
+        grown = np.zeros_like(frontier)
+        grown[1:] |= frontier[:-1]
+        grown[:-1] |= frontier[1:]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+
+        frontier = grown & walkable & (distances == UNREACHABLE)
+        distance += 1
+
+    return distances
+
+
+def _signature_key(signature: tuple) -> str:
+    return "_".join(str(part) for part in signature)
+
+
+def _targets_key(targets: list[tuple[int, int]]) -> str:
+    return "_".join(f"{x}-{y}" for x, y in sorted(targets))
+
+
+class NavigationCache:
+    def __init__(self, cache_path: str | None = None) -> None:
+        self.cache_path = cache_path
+
+        # map_id -> walkable grid and the signature of the map data it was built from
+        self.grids = {}
+        self.signatures = {}
+        self.fields = {}
+
+        if cache_path is not None and os.path.exists(cache_path):
+            self.load()
+
+    def has_grid(self, map_id: int, signature: tuple) -> bool:
+        return self.signatures.get(map_id) == _signature_key(signature)
+
+    def set_grid(self, map_id: int, signature: tuple, walkable: np.ndarray) -> None:
+        self.grids[map_id] = walkable
+        self.signatures[map_id] = _signature_key(signature)
+        # Fields of the old grid are stale
+        self.fields = {
+            key: field for key, field in self.fields.items() if key[0] != map_id
+        }
+
+    def field(self, map_id: int, targets: list[tuple[int, int]]) -> np.ndarray:
+        key = (map_id, _targets_key(targets))
+        field = self.fields.get(key)
+        if field is None:
+            field = distance_field(self.grids[map_id], targets)
+            self.fields[key] = field
+        return field
+
+    def distance(self, map_id: int, targets: list[tuple[int, int]], x: int, y: int) -> int:
+        field = self.field(map_id, targets)
+        if not (0 <= y < field.shape[0] and 0 <= x < field.shape[1]):
+            return UNREACHABLE
+        return int(field[y, x])
+
+    def save(self) -> None:
+        # Called explicitly - e.g. at the end of training - never from inside a step
+        if self.cache_path is None:
+            return
+
+        arrays = {}
+        for map_id, grid in self.grids.items():
+            arrays[f"grid_{map_id}"] = grid
+            arrays[f"signature_{map_id}"] = np.array(self.signatures[map_id])
+        for (map_id, targets), field in self.fields.items():
+            arrays[f"field_{map_id}_{targets}"] = field
+
+        # Write then rename so parallel workers never read a partial cache
+        directory = os.path.dirname(self.cache_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(temp_path, **arrays)
+        os.replace(temp_path, self.cache_path)
+
+    def load(self) -> None:
+        try:
+            with np.load(self.cache_path) as data:
+                for name in data.files:
+                    kind, map_id, *targets = name.split("_", 2)
+                    if kind == "grid":
+                        self.grids[int(map_id)] = data[name]
+                    elif kind == "signature":
+                        self.signatures[int(map_id)] = str(data[name])
+                    elif kind == "field":
+                        self.fields[(int(map_id), targets[0])] = data[name]
+        except (OSError, ValueError) as error:
+            logging.warning(f"Ignoring unreadable navigation cache {self.cache_path}: {error}")
+            self.grids = {}
+            self.signatures = {}
+            self.fields = {}
+            return
+
+        # Grids saved without a signature can't be checked against the map data - rebuild them
+        for map_id in set(self.grids) - set(self.signatures):
+            del self.grids[map_id]
+        self.fields = {key: field for key, field in self.fields.items() if key[0] in self.grids}
@@ -1,4 +1,8 @@
+import copy
+import hashlib
+import logging
 import random
+from pathlib import Path
 from functools import cached_property
 from abc import abstractmethod
 
@@ -6,7 +10,53 @@ import numpy as np
 from pyboy.utils import WindowEvent
 
 from pyboy_environment.environments.pyboy_environment import PyboyEnvironment
+from pyboy_environment.environments.macro_actions import MacroAction
+from pyboy_environment.environments.count_min_sketch import CountMinSketch
+from pyboy_environment.environments.pokemon.navigation import NavigationCache, UNREACHABLE
+from pyboy_environment.environments.pokemon.warp_graph import WarpGraph
+from pyboy_environment.environments.pokemon import world_map
+from pyboy_environment.environments.pokemon import sprites
+from pyboy_environment.environments.pokemon.battle import BattleDecoder
 from pyboy_environment.environments.pokemon import pokemon_constants as pkc
+from pyboy_environment.environments.pokemon.pokemon_stats import (
+    PokemonStatsDelta,
+    PokemonStatsSnapshot,
+)
+
+# Frames a button is held for in adaptive mode before waiting on the game to be ready again
+ADAPTIVE_HOLD_FRAMES = 8
+
+# Fast-forward presses A for this many frames at each text prompt
+FAST_FORWARD_HOLD_FRAMES = 4
+# Frames to let the next page of text print before deciding a menu is waiting on the agent
+FAST_FORWARD_SETTLE_FRAMES = 120
+# Upper bound on the frames skipped after a single action
+FAST_FORWARD_MAX_FRAMES = 3000
+
+# Background tile map buffer (wTileMap) - 20x18 tiles - and the filled menu cursor drawn while a menu takes input
+TILE_MAP = 0xC3A0
+TILE_MAP_WIDTH = 20
+TILE_MAP_HEIGHT = 18
+MENU_CURSOR = 0xED
+
+# Parts of the game stats that can make up a novelty key - see enable_novelty
+NOVELTY_KEY_FIELDS = {
+    "map_id": lambda stats, sums: stats["location"]["map_id"],
+    "x": lambda stats, sums: stats["location"]["x"],
+    "y": lambda stats, sums: stats["location"]["y"],
+    "event_count": lambda stats, sums: sums["events"],
+    "party_levels": lambda stats, sums: tuple(stats["levels"]),
+    "level_sum": lambda stats, sums: sums["levels"],
+    "badges": lambda stats, sums: stats["badges"],
+    "party_size": lambda stats, sums: stats["party_size"],
+}
+DEFAULT_NOVELTY_KEY = ("map_id", "x", "y", "event_count", "party_levels")
+
+# https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/ram/wram.asm
+# Block ids of the current map surrounded by a 3 block border
+OVERWORLD_MAP = 0xC6E8
+OVERWORLD_MAP_SIZE = 1300
+MAP_BORDER = 3
 
 
 class PokemonEnvironment(PyboyEnvironment):
@@ -19,7 +69,39 @@ class PokemonEnvironment(PyboyEnvironment):
         emulation_speed: int = 0,
         headless: bool = False,
         init_name: str = "has_pokedex.state",
+        macro_actions: list[MacroAction] | None = None,
+        adaptive_act_freq: bool = False,
+        fast_forward: bool = False,
     ) -> None:
+        # act_freq becomes the frame cap of each action when adaptive
+        self.adaptive_act_freq = adaptive_act_freq
+
+        # Skip dialogue and cutscenes after each action
+        self.fast_forward = fast_forward
+
+        # Reused buffers of the previous step's stats that each step's delta is taken against
+        self.stats_snapshot = PokemonStatsSnapshot()
+
+        # Visit counts for exploration bonuses - see enable_novelty
+        self.novelty = None
+        self.novelty_key = DEFAULT_NOVELTY_KEY
+
+        # Walkable grids and distance fields per map - see enable_navigation
+        self.navigation = None
+        # (map_id, map header) the current map's grid was last validated against
+        self.navigation_key = None
+
+        # Map connections recorded whenever map_id changes - see enable_warp_graph
+        self.warp_graph = None
+
+        # Explored-world canvas per map and the tile class table of the current tileset - see enable_minimap
+        self.world_map = None
+        self.tile_classes = None
+        self.tile_classes_key = None
+
+        # Battle structs are only decoded while wIsInBattle is set
+        self.battle_decoder = BattleDecoder()
+
         super().__init__(
             task=task,
             rom_name="PokemonRed.gb",
@@ -30,6 +112,7 @@ class PokemonEnvironment(PyboyEnvironment):
             valid_actions=valid_actions,
             release_button=release_button,
             headless=headless,
+            macro_actions=macro_actions,
         )
 
     @cached_property
@@ -59,23 +142,218 @@ class PokemonEnvironment(PyboyEnvironment):
             "Non-image based observation space not implemented - override this method to implement it"
         )
 
-    def _run_action_on_emulator(self, action_array: np.ndarray) -> None:
+    def _action_index(self, action_array: np.ndarray) -> int:
         action = action_array[0]
         action = min(action, 0.99)
 
         # Continuous Action is a float between 0 - 1 from Value based methods
         # We need to convert this to an action that the emulator can understand
-        bins = np.linspace(0, 1, len(self.valid_actions) + 1)
-        button = np.digitize(action, bins) - 1
+        # Macro actions take the bins after the single button actions
+        bins = np.linspace(0, 1, len(self.valid_actions) + len(self.macro_actions) + 1)
+        return np.digitize(action, bins) - 1
+
+    def _decode_macro_action(self, action_array: np.ndarray) -> MacroAction | None:
+        index = self._action_index(action_array) - len(self.valid_actions)
+        if index < 0:
+            return None
+        return self.macro_actions[index]
+
+    def _run_action_on_emulator(self, action_array: np.ndarray) -> None:
+        button = self._action_index(action_array)
 
         # Push the button for a few frames
         self.pyboy.send_input(self.valid_actions[button])
 
-        for _ in range(self.act_freq):
-            self.pyboy.tick()
+        if self.adaptive_act_freq:
+            self._run_adaptive_action(button)
+        else:
+            self._tick_frames(self.act_freq)
+
+            # Release the button
+            self.pyboy.send_input(self.release_button[button])
+
+        if self.fast_forward:
+            self._fast_forward()
+
+    def _run_adaptive_action(self, button: int) -> None:
+        hold_frames = min(ADAPTIVE_HOLD_FRAMES, self.act_freq)
+        held = self._tick_frames(hold_frames)
 
-        # Release the button
         self.pyboy.send_input(self.release_button[button])
+        if not held:
+            return
+
+        # Stop as soon as the game will accept the next input rather than burning the full act_freq
+        frames = hold_frames
+        while frames < self.act_freq:
+            if not self._tick_frames(1):
+                break
+            frames += 1
+            if self._is_ready_for_input():
+                break
+
+    def _fast_forward(self) -> None:
+        # Runs uncapped and unrendered until the agent has a real decision to make
+        if self.emulation_speed != 0:
+            self.pyboy.set_emulation_speed(0)
+
+        frames = 0
+        presses = 0
+        # Text the agent's own action opened may still be printing - menus are caught by the check below
+        settle_frames = FAST_FORWARD_SETTLE_FRAMES if self._is_text_box_open() else 0
+        while frames < FAST_FORWARD_MAX_FRAMES and not self.triggered_watchpoints:
+            if self._is_menu_waiting():
+                # A menu is a decision for the agent
+                break
+
+            if self._is_text_prompt_waiting():
+                self.pyboy.send_input(WindowEvent.PRESS_BUTTON_A)
+                self._tick_frames(FAST_FORWARD_HOLD_FRAMES, False)
+                self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_A)
+                self._tick_frames(1, False)
+                frames += FAST_FORWARD_HOLD_FRAMES + 1
+                presses += 1
+                settle_frames = FAST_FORWARD_SETTLE_FRAMES
+            elif self._is_scripted() or (settle_frames > 0 and self._is_text_box_open()):
+                self._tick_frames(1, False)
+                frames += 1
+                settle_frames -= 1
+            else:
+                break
+
+        if self.emulation_speed != 0:
+            self.pyboy.set_emulation_speed(self.emulation_speed)
+
+        self.step_info["fast_forward_frames"] = frames
+        self.step_info["fast_forward_presses"] = presses
+
+    def enable_novelty(
+        self,
+        key: tuple[str, ...] = DEFAULT_NOVELTY_KEY,
+        width: int = 1 << 16,
+        depth: int = 4,
+        decay: float = 1.0,
+        decay_interval: int = 0,
+        seed: int = 0,
+    ) -> CountMinSketch:
+        unknown = [name for name in key if name not in NOVELTY_KEY_FIELDS]
+        if unknown:
+            raise ValueError(
+                f"Unknown novelty key fields: {unknown} - expected any of {list(NOVELTY_KEY_FIELDS)}"
+            )
+
+        # Counts persist across episodes - merge the sketches of parallel workers with self.novelty.merge
+        self.novelty_key = key
+        self.novelty = CountMinSketch(width, depth, decay, decay_interval, seed)
+        return self.novelty
+
+    def enable_navigation(self, cache_path: str | None = None) -> NavigationCache:
+        # Grids and distance fields are loaded from cache_path - write them back with self.navigation.save()
+        if cache_path == "default":
+            cache_path = f"{Path.home()}/cares_rl_configs/{self.domain}/navigation_cache.npz"
+        self.navigation = NavigationCache(cache_path)
+        self.navigation_key = None
+        return self.navigation
+
+    def reset(self) -> np.ndarray:
+        # Warps found last episode are written out here rather than from inside step()
+        if self.warp_graph is not None and self.warp_graph.dirty:
+            self.warp_graph.save()
+
+        if self.world_map is None:
+            return super().reset()
+
+        self.world_map.clear()
+        state = super().reset()
+
+        # Repaint around the start position so the first minimap of the episode is not blank
+        self._update_world_map(self.prior_game_stats)
+        if self.frame_stack_source == "minimap":
+            self.frame_stack.clear()
+            self._push_frame_stack()
+        return state
+
+    def enable_minimap(self, crop_height: int = 16, crop_width: int = 16, scale: int = 2) -> None:
+        self.world_map = world_map.WorldMap(crop_height, crop_width, scale)
+        self._update_world_map(self.prior_game_stats)
+
+    def minimap(self, copy: bool = True) -> np.ndarray:
+        # uint8 crop of the explored map around the player - copy=False returns a buffer the next call overwrites
+        location = self.prior_game_stats["location"]
+        crop = self.world_map.minimap(location["map_id"], location["x"], location["y"])
+        return crop.copy() if copy else crop
+
+    def enable_warp_graph(self, cache_path: str | None = None) -> WarpGraph:
+        # Edges are loaded from cache_path and written back on reset or with self.warp_graph.save()
+        if cache_path == "default":
+            cache_path = f"{Path.home()}/cares_rl_configs/{self.domain}/warp_graph.npz"
+        self.warp_graph = WarpGraph(cache_path)
+        return self.warp_graph
+
+    def _python_state(self, include_tools: bool = True) -> dict:
+        state = super()._python_state(include_tools)
+
+        # Copies keep what has been learned but never write to the shared cache files
+        for name in ("navigation", "warp_graph"):
+            cache = state[name]
+            if cache is not None and cache.cache_path is not None:
+                cache = copy.copy(cache)
+                cache.cache_path = None
+                state[name] = cache
+        return state
+
+    def _novelty_state_key(self, game_stats: dict[str, any]) -> tuple:
+        # The stats snapshot already holds this step's sums
+        sums = self.stats_snapshot.sums
+        return tuple(NOVELTY_KEY_FIELDS[name](game_stats, sums) for name in self.novelty_key)
+
+    def watch_transitions(self) -> None:
+        # Common mid-action transitions that should hand control back to the agent straight away
+        self.register_watchpoint("battle", 0xD057, "changed")
+        self.register_watchpoint("map", 0xD35E, "changed")
+        self.register_watchpoint("badges", 0xD356, "changed")
+        self.register_watchpoint("fainted", [0xD16C, 0xD16D], "equals", 0)
+
+    def _is_ready_for_input(self) -> bool:
+        # https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/ram/wram.asm
+        walk_counter = self._read_m(0xCFC5)
+        if walk_counter != 0 or self._is_scripted():
+            return False
+
+        # With a text box open only accept input once the "more text" arrow or a menu is waiting
+        return (
+            not self._is_text_box_open()
+            or self._is_text_prompt_waiting()
+            or self._is_menu_waiting()
+        )
+
+    def _is_scripted(self) -> bool:
+        joy_ignore = self._read_m(0xCD6B)
+        # wd730 bit 5 - ignore joypad input, bit 7 - simulated joypad / scripted movement
+        status_flags = self._read_m(0xD730)
+        return joy_ignore != 0 or status_flags & 0xA0 != 0
+
+    def _is_text_box_open(self) -> bool:
+        return self._read_m(0xCFC4) & 0x01 == 1
+
+    def _is_text_prompt_waiting(self) -> bool:
+        # Blinking arrow in the bottom right of the text box
+        return self._read_m(0xC4F2) == 0xEE
+
+    def _is_menu_waiting(self) -> bool:
+        # wMenuWatchedKeys is left set after a menu closes - the filled cursor is only drawn while it takes input
+        if self._read_m(0xCC29) == 0:
+            return False
+
+        top_y = self._read_m(0xCC24)
+        x = self._read_m(0xCC25)
+        max_item = self._read_m(0xCC28)
+        if x >= TILE_MAP_WIDTH:
+            return False
+
+        # Items are one or two rows apart depending on the menu - check every row the cursor could be on
+        rows = range(top_y, min(top_y + 2 * max_item + 1, TILE_MAP_HEIGHT))
+        return any(self._read_m(TILE_MAP + row * TILE_MAP_WIDTH + x) == MENU_CURSOR for row in rows)
 
     def _generate_game_stats(self) -> dict[str, any]:
         return {
@@ -96,6 +374,61 @@ class PokemonEnvironment(PyboyEnvironment):
             "events": self._read_events(),
         }
 
+    def _compute_stats_delta(self, game_stats: dict[str, any]) -> PokemonStatsDelta:
+        # prior_game_stats is replaced on reset and when restoring checkpoints - reload the buffers to match
+        if self.stats_snapshot.source is not self.prior_game_stats:
+            self.stats_snapshot.load(self.prior_game_stats)
+
+        x, y, map_id = self.stats_snapshot.location
+        delta = self.stats_snapshot.advance(game_stats)
+
+        if self.warp_graph is not None and delta.location:
+            to_x, to_y, to_map = self.stats_snapshot.location
+            if to_map != map_id:
+                self.warp_graph.record((map_id, x, y), (to_map, to_x, to_y))
+
+        if self.world_map is not None and delta.location:
+            self._update_world_map(game_stats)
+        return delta
+
+    def _update_world_map(self, game_stats: dict[str, any]) -> None:
+        location = game_stats["location"]
+        map_shape = (self._read_m(0xD368) * 2, self._read_m(0xD369) * 2)
+        self.world_map.update(
+            location["map_id"],
+            location["x"],
+            location["y"],
+            map_shape,
+            self._read_window_cell_classes,
+        )
+
+    def _get_tile_classes(self) -> np.ndarray:
+        # Class of every tile id under the current tileset - only rebuilt when the collision data changes
+        key = (self._read_m(0xD530), self._read_m(0xD531), self._read_m(0xFFD7), self._read_m(0xD535))
+        if key != self.tile_classes_key:
+            self.tile_classes = np.full(256, world_map.BLOCKED, dtype=np.uint8)
+            self.tile_classes[self._get_walkable_tile_ids()] = world_map.WALKABLE
+            if key[2] > 0 and key[3] != 0xFF:
+                self.tile_classes[key[3]] = world_map.GRASS
+            self.tile_classes_key = key
+        return self.tile_classes
+
+    def _read_window_cell_classes(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        # Reads only the requested cells straight from the background map in VRAM
+        background = 0x9C00 if self._read_m(0xFF40) & 0x08 else 0x9800
+        scroll_row = self._read_m(0xFF42) // 8
+        scroll_column = self._read_m(0xFF43) // 8
+
+        # Collision uses the bottom left tile of each 2x2 step, as in _get_screen_walkable_matrix
+        tile_rows = (scroll_row + rows * 2 + 1) % 32
+        tile_columns = (scroll_column + columns * 2) % 32
+        addresses = background + tile_rows[:, np.newaxis] * 32 + tile_columns
+        tiles = np.array(
+            [self._read_m(address) for address in addresses.ravel().tolist()],
+            dtype=np.uint8,
+        )
+        return self._get_tile_classes()[tiles].reshape(addresses.shape)
+
     @abstractmethod
     def _calculate_reward(self, new_state: dict) -> float:
         # Implement your reward calculation logic here
@@ -227,27 +560,33 @@ class PokemonEnvironment(PyboyEnvironment):
 
     def _get_screen_background_tilemap(self):
         ### SIMILAR TO CURRENT pyboy.game_wrapper()._game_area_np(), BUT ONLY FOR BACKGROUND TILEMAP, SO NPC ARE SKIPPED
-        bsm = self.pyboy.botsupport_manager()
-        ((scx, scy), (wx, wy)) = bsm.screen().tilemap_position()
-        tilemap = np.array(bsm.tilemap_background()[:, :])
+        ((scx, scy), (wx, wy)) = self.pyboy.screen.get_tilemap_position()
+        tilemap = np.array(self.pyboy.tilemap_background[:, :])
         return np.roll(np.roll(tilemap, -scy // 8, axis=0), -scx // 8, axis=1)[:18, :20]
 
-    def _get_screen_walkable_matrix(self):
+    def _get_walkable_tile_ids(self) -> list[int]:
         walkable_tiles_indexes = []
-        collision_ptr = self.pyboy.get_memory_value(0xD530) + (
-            self.pyboy.get_memory_value(0xD531) << 8
+        collision_ptr = self._read_m(0xD530) + (
+            self._read_m(0xD531) << 8
         )
-        tileset_type = self.pyboy.get_memory_value(0xFFD7)
+        tileset_type = self._read_m(0xFFD7)
         if tileset_type > 0:
-            grass_tile_index = self.pyboy.get_memory_value(0xD535)
+            grass_tile_index = self._read_m(0xD535)
             if grass_tile_index != 0xFF:
-                walkable_tiles_indexes.append(grass_tile_index + 0x100)
+                walkable_tiles_indexes.append(grass_tile_index)
         for i in range(0x180):
-            tile_index = self.pyboy.get_memory_value(collision_ptr + i)
+            tile_index = self._read_m(collision_ptr + i)
             if tile_index == 0xFF:
                 break
             else:
-                walkable_tiles_indexes.append(tile_index + 0x100)
+                walkable_tiles_indexes.append(tile_index)
+        return walkable_tiles_indexes
+
+    def _get_screen_walkable_matrix(self):
+        # The background tilemap numbers these tiles from 0x100
+        walkable_tiles_indexes = [
+            tile_index + 0x100 for tile_index in self._get_walkable_tile_ids()
+        ]
         screen_tiles = self._get_screen_background_tilemap()
         bottom_left_screen_tiles = screen_tiles[1 : 1 + screen_tiles.shape[0] : 2, ::2]
         walkable_matrix = np.isin(
@@ -255,6 +594,98 @@ class PokemonEnvironment(PyboyEnvironment):
         ).astype(np.uint8)
         return walkable_matrix
 
+    def _read_map_header(self) -> tuple:
+        # Tileset id, dimensions and block data pointer (0xD367-0xD36B), then the tileset's bank, blockset and
+        # collision pointers and its type - a few bytes that change whenever a different map's data is loaded
+        return (
+            *self.pyboy.memory[0xD367:0xD36C],
+            *self.pyboy.memory[0xD52B:0xD532],
+            self._read_m(0xFFD7),
+        )
+
+    def _read_map_blocks(self, header: tuple | None = None) -> tuple[tuple, np.ndarray]:
+        # Block ids of the whole current map and a signature of the header plus a hash of the blocks
+        if header is None:
+            header = self._read_map_header()
+        height = header[1]
+        width = header[2]
+        stride = width + 2 * MAP_BORDER
+        rows = height + 2 * MAP_BORDER
+        if rows * stride > OVERWORLD_MAP_SIZE:
+            raise ValueError(f"Map dimensions {width}x{height} do not fit the overworld map buffer")
+
+        blocks = np.array(
+            self.pyboy.memory[OVERWORLD_MAP : OVERWORLD_MAP + rows * stride], dtype=np.uint8
+        ).reshape(rows, stride)
+        blocks = blocks[MAP_BORDER : MAP_BORDER + height, MAP_BORDER : MAP_BORDER + width]
+
+        blocks_hash = hashlib.blake2b(blocks.tobytes(), digest_size=8).hexdigest()
+        return (*header, blocks_hash), blocks
+
+    def _get_map_walkable_matrix(self, blocks: np.ndarray | None = None) -> np.ndarray:
+        # Walkable grid of the whole current map - one cell per step, indexed [y, x] like the location
+        if blocks is None:
+            _, blocks = self._read_map_blocks()
+        height, width = blocks.shape
+        blocks = blocks.astype(np.int64)
+
+        # Each block is 4x4 tiles - the blockset lives in the tileset's ROM bank
+        bank = self._read_m(0xD52B)
+        blocks_ptr = self._read_m(0xD52C) + (self._read_m(0xD52D) << 8)
+        blockset_end = blocks_ptr + (int(blocks.max(initial=0)) + 1) * 16
+        if blocks_ptr >= 0x4000:
+            blockset = self.pyboy.memory[bank, blocks_ptr:blockset_end]
+        else:
+            blockset = self.pyboy.memory[blocks_ptr:blockset_end]
+        blockset = np.array(blockset, dtype=np.uint8).reshape(-1, 4, 4)
+
+        # Collision uses the bottom left tile of each 2x2 step, as in _get_screen_walkable_matrix
+        step_tiles = blockset[blocks][:, :, 1::2, ::2]
+        step_tiles = step_tiles.transpose(0, 2, 1, 3).reshape(height * 2, width * 2)
+        return np.isin(step_tiles, self._get_walkable_tile_ids())
+
+    def _distance_to(self, targets: list[tuple[int, int]], new_state: dict[str, any]) -> int:
+        # Path distance in steps from the player to the nearest (x, y) target on the current map, -1 if unknown
+        if self.navigation is None:
+            self.enable_navigation()
+
+        location = new_state["location"]
+        map_id = location["map_id"]
+
+        # The blocks are only read and hashed when the map or its header changes - mid-warp the new map_id can be
+        # reported before its header and blocks load, and the header changing again triggers another check
+        key = (map_id, self._read_map_header())
+        if key != self.navigation_key:
+            try:
+                signature, blocks = self._read_map_blocks(key[1])
+                if not self.navigation.has_grid(map_id, signature):
+                    self.navigation.set_grid(map_id, signature, self._get_map_walkable_matrix(blocks))
+            except (ValueError, IndexError) as error:
+                logging.debug("No walkable grid for map %s: %s", map_id, error)
+                return UNREACHABLE
+            self.navigation_key = key
+
+        return self.navigation.distance(map_id, targets, location["x"], location["y"])
+
+    def _map_distance_to(self, goal_map: int, new_state: dict[str, any]) -> int:
+        # Map transitions on the shortest known route to goal_map, -1 until a route has been seen
+        if self.warp_graph is None:
+            self.enable_warp_graph()
+        return self.warp_graph.map_distance(new_state["location"]["map_id"], goal_map)
+
+    def _warp_towards(self, goal_map: int, new_state: dict[str, any]) -> tuple[int, int] | None:
+        # (x, y) of the first warp on the known route to goal_map - a target for _distance_to
+        if self.warp_graph is None:
+            self.enable_warp_graph()
+        return self.warp_graph.exit_towards(new_state["location"]["map_id"], goal_map)
+
+    def _frame_stack_sources(self) -> dict:
+        sources = super()._frame_stack_sources()
+        sources["collision"] = self.game_area_collision
+        sources["minimap"] = lambda: self.minimap(copy=False)
+        sources["sprites"] = self.game_area_sprites
+        return sources
+
     def game_area_collision(self):
         shape = (20, 18)
         game_area_section = (0, 0) + shape
@@ -269,30 +700,60 @@ class PokemonEnvironment(PyboyEnvironment):
                 game_area[i * 2 + 1][j * 2 : j * 2 + 2] = _collision[i][j]
         return game_area
 
+    def get_sprites(self) -> np.ndarray:
+        # Structured (16,) array of the sprite state tables - sprite 0 is the player
+        return sprites.decode_sprites(self.pyboy.memory)
+
+    def game_area_sprites(self, include_player: bool = False) -> np.ndarray:
+        # Picture ids of the NPCs on screen, aligned with game_area_collision
+        return sprites.sprite_layer(self.get_sprites(), include_player=include_player)
+
+    def _is_in_battle(self) -> bool:
+        return self._read_m(0xD057) != 0
+
+    def get_battle_state(self, copy: bool = True) -> np.ndarray:
+        # Fixed-layout battle observation - see battle.BATTLE_FIELDS - copy=False shares read-only zeros outside battle
+        return self.battle_decoder.decode(self.pyboy.memory, copy)
+
     # Note: These are all examples of rewards we can calculate based on the stats, you can implement and modify your own as you please
 
+    def _step_delta(self, new_state: dict[str, any]) -> PokemonStatsDelta:
+        # The step's delta is reused when new_state is the stats handed to _calculate_reward
+        if self.stats_delta is not None and new_state is self.stats_snapshot.source:
+            return self.stats_delta
+
+        # Any other stats are compared against prior_game_stats, as the helpers always have been
+        snapshot = PokemonStatsSnapshot()
+        snapshot.load(self.prior_game_stats)
+        return snapshot.advance(new_state)
+
     def _caught_reward(self, new_state: dict[str, any]) -> int:
-        return new_state["caught_pokemon"] - self.prior_game_stats["caught_pokemon"]
+        return self._step_delta(new_state).caught_pokemon
 
     def _seen_reward(self, new_state: dict[str, any]) -> int:
-        return new_state["seen_pokemon"] - self.prior_game_stats["seen_pokemon"]
+        return self._step_delta(new_state).seen_pokemon
 
     def _health_reward(self, new_state: dict[str, any]) -> int:
-        return sum(new_state["hp"]["current"]) - sum(
-            self.prior_game_stats["hp"]["current"]
-        )
+        return self._step_delta(new_state).hp
 
     def _xp_reward(self, new_state: dict[str, any]) -> int:
-        return sum(new_state["xp"]) - sum(self.prior_game_stats["xp"])
+        return self._step_delta(new_state).xp
 
     def _levels_reward(self, new_state: dict[str, any]) -> int:
-        return sum(new_state["levels"]) - sum(self.prior_game_stats["levels"])
+        return self._step_delta(new_state).levels
 
     def _badges_reward(self, new_state: dict[str, any]) -> int:
-        return new_state["badges"] - self.prior_game_stats["badges"]
+        return self._step_delta(new_state).badges
 
     def _money_reward(self, new_state: dict[str, any]) -> int:
-        return new_state["money"] - self.prior_game_stats["money"]
+        return self._step_delta(new_state).money
 
     def _event_reward(self, new_state: dict[str, any]) -> int:
-        return sum(new_state["events"]) - sum(self.prior_game_stats["events"])
+        return self._step_delta(new_state).events
+
+    def _novelty_reward(self, new_state: dict[str, any]) -> float:
+        # Pseudo-count bonus 1 / sqrt(visits) - counts this step's visit
+        if self.novelty is None:
+            self.enable_novelty()
+        count = self.novelty.update(self._novelty_state_key(new_state))
+        return 1.0 / np.sqrt(count)
@@ -0,0 +1,96 @@
+"""
+Per-step deltas of the Pokemon game stats.
+
+The reward helpers used to re-sum the old and new party lists on every call. The snapshot below keeps the
+previous step's values in buffers that are overwritten in place, along with their sums, and produces a small
+delta record holding only what changed. Each list is summed once per step and unchanged fields cost a single
+comparison.
+"""
+
+# Fields compared directly
+SCALAR_FIELDS = ("party_size", "badges", "caught_pokemon", "seen_pokemon", "money")
+
+# Fields whose rewards are based on the sum of a list
+SUMMED_FIELDS = ("xp", "levels", "hp", "events")
+
+
+def _field_values(game_stats: dict[str, any], name: str) -> list[int]:
+    if name == "hp":
+        return game_stats["hp"]["current"]
+    return game_stats[name]
+
+
+class PokemonStatsDelta:
+    __slots__ = SCALAR_FIELDS + SUMMED_FIELDS + ("location", "changed")
+
+    def __init__(self) -> None:
+        for name in SCALAR_FIELDS + SUMMED_FIELDS:
+            setattr(self, name, 0)
+
+        # True if the player moved or changed map
+        self.location = False
+
+        # Names of the fields that changed this step
+        self.changed = ()
+
+    def __repr__(self) -> str:
+        deltas = ", ".join(f"{name}={getattr(self, name)}" for name in self.changed)
+        return f"PokemonStatsDelta({deltas})"
+
+
+class PokemonStatsSnapshot:
+    def __init__(self) -> None:
+        self.scalars = dict.fromkeys(SCALAR_FIELDS, 0)
+        self.lists = {name: [] for name in SUMMED_FIELDS}
+        self.sums = dict.fromkeys(SUMMED_FIELDS, 0)
+        self.location = (0, 0, 0)
+
+        # The game stats dict the buffers currently hold
+        self.source = None
+
+    def load(self, game_stats: dict[str, any]) -> None:
+        for name in SCALAR_FIELDS:
+            self.scalars[name] = game_stats[name]
+
+        for name in SUMMED_FIELDS:
+            values = _field_values(game_stats, name)
+            self.lists[name][:] = values
+            self.sums[name] = sum(values)
+
+        self._load_location(game_stats["location"])
+        self.source = game_stats
+
+    def advance(self, game_stats: dict[str, any]) -> PokemonStatsDelta:
+        # Diffs game_stats against the buffers, then overwrites them with game_stats
+        delta = PokemonStatsDelta()
+        changed = []
+
+        for name in SCALAR_FIELDS:
+            value = game_stats[name]
+            if value != self.scalars[name]:
+                setattr(delta, name, value - self.scalars[name])
+                self.scalars[name] = value
+                changed.append(name)
+
+        for name in SUMMED_FIELDS:
+            values = _field_values(game_stats, name)
+            buffer = self.lists[name]
+            if values != buffer:
+                total = sum(values)
+                setattr(delta, name, total - self.sums[name])
+                buffer[:] = values
+                self.sums[name] = total
+                changed.append(name)
+
+        location = game_stats["location"]
+        if (location["x"], location["y"], location["map_id"]) != self.location:
+            self._load_location(location)
+            delta.location = True
+            changed.append("location")
+
+        delta.changed = tuple(changed)
+        self.source = game_stats
+        return delta
+
+    def _load_location(self, location: dict[str, any]) -> None:
+        self.location = (location["x"], location["y"], location["map_id"])
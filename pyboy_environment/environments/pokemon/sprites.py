@@ -0,0 +1,118 @@
+"""
+Decodes the 16 sprite state entries of Pokemon Red in one read.
+
+wSpriteStateData1 (0xC100) and wSpriteStateData2 (0xC200) hold 16 bytes per sprite each - sprite 0 is the player.
+Both tables are read with a single 512 byte slice and interleaved into one structured array, so every field
+is available as a (16,) array. The sprites can be drawn into a layer aligned with game_area_collision.
+
+https://github.com/pret/pokered/blob/91dc3c9f9c8fd529bb6e8307b58b96efa0bec67e/ram/wram.asm
+"""
+
+import numpy as np
+
+from pyboy_environment.environments.ram_observation import read_region
+
+SPRITE_STATE_START = 0xC100
+SPRITE_STATE_END = 0xC300
+SPRITE_COUNT = 16
+SPRITE_STATE_SIZE = 16
+
+# Offsets into the 32 byte interleaved entry - data 2 starts at 16
+SPRITE_DTYPE = np.dtype(
+    {
+        "names": [
+            "picture_id",
+            "movement_status",
+            "image_index",
+            "y_step",
+            "y_pixels",
+            "x_step",
+            "x_pixels",
+            "facing",
+            "walk_counter",
+            "map_y",
+            "map_x",
+            "movement_byte",
+            "grass",
+            "movement_delay",
+            "image_base",
+        ],
+        "formats": [
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.int8,
+            np.uint8,
+            np.int8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+            np.uint8,
+        ],
+        "offsets": [0, 1, 2, 3, 4, 5, 6, 9, 16, 20, 21, 22, 23, 24, 30],
+        "itemsize": 2 * SPRITE_STATE_SIZE,
+    }
+)
+
+# Facing direction values
+FACING_DOWN = 0x0
+FACING_UP = 0x4
+FACING_LEFT = 0x8
+FACING_RIGHT = 0xC
+
+# image_index of sprites that are not on screen
+OFF_SCREEN = 0xFF
+
+# The map position in data 2 is offset by 4 in both axes
+MAP_POSITION_OFFSET = 4
+
+# Sprites are drawn 4 pixels above their tile so they overlap the tile above
+SPRITE_Y_OFFSET = 4
+
+
+def decode_sprites(memory) -> np.ndarray:
+    raw = np.empty(SPRITE_STATE_END - SPRITE_STATE_START, dtype=np.uint8)
+    read_region(memory, SPRITE_STATE_START, SPRITE_STATE_END, raw)
+
+    # (table, sprite, byte) -> (sprite, table, byte) so each sprite's two entries sit next to each other
+    entries = raw.reshape(2, SPRITE_COUNT, SPRITE_STATE_SIZE).transpose(1, 0, 2).copy()
+    return entries.reshape(SPRITE_COUNT, 2 * SPRITE_STATE_SIZE).view(SPRITE_DTYPE)[:, 0]
+
+
+def visible_sprites(sprites: np.ndarray) -> np.ndarray:
+    return (sprites["picture_id"] != 0) & (sprites["image_index"] != OFF_SCREEN)
+
+
+def sprite_layer(
+    sprites: np.ndarray,
+    shape: tuple[int, int] = (18, 20),
+    include_player: bool = False,
+) -> np.ndarray:
+    # Picture ids of the on-screen sprites on the 8x8 tile grid - each sprite covers 2x2 tiles
+    layer = np.zeros(shape, dtype=np.uint32)
+
+    visible = visible_sprites(sprites)
+    if not include_player:
+        visible[0] = False
+    sprites = sprites[visible]
+
+    rows = (sprites["y_pixels"].astype(np.int64) + SPRITE_Y_OFFSET) // 8
+    columns = sprites["x_pixels"].astype(np.int64) // 8
+    picture_ids = sprites["picture_id"]
+    for row_offset in (0, 1):
+        for column_offset in (0, 1):
+            tile_rows = rows + row_offset
+            tile_columns = columns + column_offset
+            on_screen = (
+                (tile_rows >= 0)
+                & (tile_rows < shape[0])
+                & (tile_columns >= 0)
+                & (tile_columns < shape[1])
+            )
+            layer[tile_rows[on_screen], tile_columns[on_screen]] = picture_ids[on_screen]
+    return layer
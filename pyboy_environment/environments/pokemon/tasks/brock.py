@@ -7,6 +7,7 @@ from pyboy_environment.environments.pokemon.pokemon_environment import (
     PokemonEnvironment,
 )
 from pyboy_environment.environments.pokemon import pokemon_constants as pkc
+from pyboy_environment.environments.macro_actions import MacroAction
 
 
 class PokemonBrock(PokemonEnvironment):
@@ -15,6 +16,9 @@ class PokemonBrock(PokemonEnvironment):
         act_freq: int,
         emulation_speed: int = 0,
         headless: bool = False,
+        macro_actions: list[MacroAction] | None = None,
+        adaptive_act_freq: bool = False,
+        fast_forward: bool = False,
     ) -> None:
 
         valid_actions: list[WindowEvent] = [
@@ -45,6 +49,9 @@ class PokemonBrock(PokemonEnvironment):
             valid_actions=valid_actions,
             release_button=release_button,
             headless=headless,
+            macro_actions=macro_actions,
+            adaptive_act_freq=adaptive_act_freq,
+            fast_forward=fast_forward,
         )
 
         self.previous_reward = 0
@@ -75,8 +82,13 @@ class PokemonBrock(PokemonEnvironment):
             target_x = 10
             target_y = 0
         
-        reward = 1 / (abs(cur_x - target_x) + abs(cur_y - target_y) + 1)
-        return reward
+        # Path distance around walls - Manhattan distance if the target can't be reached on the walkable grid
+        distance = self._distance_to([(target_x, target_y)], new_state)
+        if distance < 0:
+            distance = abs(cur_x - target_x) + abs(cur_y - target_y)
+
+        reward = 1 / (distance + 1)
+        return self._record_rewards({"distance_reward": reward})
 
     def _check_if_done(self, game_stats: dict[str, any]) -> bool:
         # Setting done to true if agent beats first gym (temporary)
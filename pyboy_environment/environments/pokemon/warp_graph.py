@@ -0,0 +1,158 @@
+"""
+Map connectivity learned from play.
+
+Whenever map_id changes between steps the (from_map, x, y) -> (to_map, x, y) edge is recorded - warps through
+doors and walking off the edge of a map alike. Edges are stored as a uint8 structured array. Map to map hop
+counts and next hops are computed for all pairs in one pass the first time they are needed after a new edge,
+so route and distance queries are array lookups. New edges are only written to the cache file by an explicit
+save().
+"""
+
+import logging
+import os
+from collections import deque
+
+import numpy as np
+
+# Map ids fit in a byte - 0xFF is the game's "last map" marker
+MAP_COUNT = 256
+
+# Maps with no known route between them
+UNREACHABLE = -1
+
+EDGE_DTYPE = np.dtype(
+    [
+        ("from_map", np.uint8),
+        ("x", np.uint8),
+        ("y", np.uint8),
+        ("to_map", np.uint8),
+        ("to_x", np.uint8),
+        ("to_y", np.uint8),
+    ]
+)
+
+
+class WarpGraph:
+    def __init__(self, cache_path: str | None = None) -> None:
+        self.cache_path = cache_path
+
+        # (from_map, x, y) -> (to_map, to_x, to_y)
+        self.edges = {}
+        # (from_map, to_map) -> the first edge recorded between them
+        self.links = {}
+
+        self.distances = None
+        self.next_hops = None
+
+        # Edges recorded since the last save
+        self.dirty = False
+
+        if cache_path is not None and os.path.exists(cache_path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def record(self, source: tuple[int, int, int], destination: tuple[int, int, int]) -> bool:
+        # source and destination are (map_id, x, y) - returns True if the edge is new
+        if source[0] == destination[0] or source in self.edges:
+            return False
+
+        self._add(source, destination)
+        logging.info(f"New warp: {source} -> {destination}")
+        self.dirty = True
+        return True
+
+    def _add(self, source: tuple[int, int, int], destination: tuple[int, int, int]) -> None:
+        self.edges[source] = destination
+        self.links.setdefault((source[0], destination[0]), source + destination)
+
+        # All-pairs results are recomputed on the next query
+        self.distances = None
+        self.next_hops = None
+
+    def _compute_all_pairs(self) -> None:
+        neighbours = [[] for _ in range(MAP_COUNT)]
+        for from_map, to_map in self.links:
+            neighbours[from_map].append(to_map)
+
+        distances = np.full((MAP_COUNT, MAP_COUNT), UNREACHABLE, dtype=np.int16)
+        next_hops = np.full((MAP_COUNT, MAP_COUNT), UNREACHABLE, dtype=np.int16)
+
+        # Breadth first from every map that has an exit - the graph is small and sparse
+        for start in {from_map for from_map, _ in self.links}:
+            distances[start, start] = 0
+            queue = deque()
+            for neighbour in neighbours[start]:
+                if distances[start, neighbour] == UNREACHABLE:
+                    distances[start, neighbour] = 1
+                    next_hops[start, neighbour] = neighbour
+                    queue.append(neighbour)
+
+            while queue:
+                current = queue.popleft()
+                for neighbour in neighbours[current]:
+                    if distances[start, neighbour] == UNREACHABLE:
+                        distances[start, neighbour] = distances[start, current] + 1
+                        next_hops[start, neighbour] = next_hops[start, current]
+                        queue.append(neighbour)
+
+        self.distances = distances
+        self.next_hops = next_hops
+
+    def map_distance(self, from_map: int, to_map: int) -> int:
+        # Number of map transitions on the shortest known route, -1 if there is none
+        if from_map == to_map:
+            return 0
+        if self.distances is None:
+            self._compute_all_pairs()
+        return int(self.distances[from_map, to_map])
+
+    def route(self, from_map: int, to_map: int) -> list[tuple[int, int, int, int, int, int]]:
+        # Edges (from_map, x, y, to_map, to_x, to_y) of the shortest known route
+        if self.map_distance(from_map, to_map) <= 0:
+            return []
+
+        route = []
+        current = from_map
+        while current != to_map:
+            next_map = int(self.next_hops[current, to_map])
+            route.append(self.links[(current, next_map)])
+            current = next_map
+        return route
+
+    def exit_towards(self, from_map: int, to_map: int) -> tuple[int, int] | None:
+        # (x, y) on from_map of the first warp on the route to to_map
+        route = self.route(from_map, to_map)
+        if len(route) == 0:
+            return None
+        return route[0][1], route[0][2]
+
+    def to_array(self) -> np.ndarray:
+        return np.array(
+            [source + destination for source, destination in self.edges.items()],
+            dtype=EDGE_DTYPE,
+        )
+
+    def save(self) -> None:
+        # Called between episodes or explicitly - never from inside a step
+        if self.cache_path is None:
+            return
+
+        directory = os.path.dirname(self.cache_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(temp_path, edges=self.to_array())
+        os.replace(temp_path, self.cache_path)
+        self.dirty = False
+
+    def load(self) -> None:
+        try:
+            with np.load(self.cache_path) as data:
+                edges = data["edges"]
+        except (OSError, ValueError, KeyError) as error:
+            logging.warning(f"Ignoring unreadable warp graph {self.cache_path}: {error}")
+            return
+
+        for edge in edges.tolist():
+            self._add(tuple(edge[:3]), tuple(edge[3:]))
@@ -0,0 +1,113 @@
+"""
+Explored-world minimap stitched together from the screen.
+
+Each map_id gets a uint8 canvas with one cell per player step holding the class of the tile seen there. When
+the player moves only the rows and columns of the 9x10 screen window that scrolled in are written, so an update
+costs O(screen edge) rather than O(screen) or O(map). A fixed-size, max-pooled crop around the player gives
+agents global context for a few hundred bytes.
+"""
+
+import numpy as np
+
+# Cell classes - higher classes win when cells are pooled
+UNSEEN = 0
+BLOCKED = 1
+WALKABLE = 2
+GRASS = 3
+
+# Screen window in cells and the player's cell within it
+WINDOW_HEIGHT = 9
+WINDOW_WIDTH = 10
+PLAYER_ROW = 4
+PLAYER_COLUMN = 4
+
+
+class WorldMap:
+    def __init__(self, crop_height: int = 16, crop_width: int = 16, scale: int = 2) -> None:
+        self.crop_height = crop_height
+        self.crop_width = crop_width
+        self.scale = scale
+
+        self.canvases = {}
+
+        # (map_id, x, y) of the last update
+        self.last_location = None
+
+        self.crop = np.zeros((crop_height, crop_width), dtype=np.uint8)
+
+    def clear(self) -> None:
+        self.canvases = {}
+        self.last_location = None
+
+    def _new_cells(self, map_id: int, x: int, y: int) -> tuple[np.ndarray, np.ndarray]:
+        # Window rows and columns that hold cells not written by the last update
+        rows = np.arange(WINDOW_HEIGHT)
+        columns = np.arange(WINDOW_WIDTH)
+        if self.last_location is None or self.last_location[0] != map_id:
+            return rows, columns
+
+        dx = x - self.last_location[1]
+        dy = y - self.last_location[2]
+        if abs(dx) >= WINDOW_WIDTH or abs(dy) >= WINDOW_HEIGHT:
+            return rows, columns
+
+        new_rows = rows[WINDOW_HEIGHT - dy :] if dy > 0 else rows[: -dy]
+        new_columns = columns[WINDOW_WIDTH - dx :] if dx > 0 else columns[: -dx]
+        return new_rows, new_columns
+
+    def update(self, map_id: int, x: int, y: int, map_shape: tuple[int, int], read_cells) -> None:
+        # read_cells(rows, columns) returns the classes of those window cells as a (len(rows), len(columns)) array
+        canvas = self.canvases.get(map_id)
+        if canvas is None or canvas.shape != map_shape:
+            canvas = np.zeros(map_shape, dtype=np.uint8)
+            self.canvases[map_id] = canvas
+            self.last_location = None
+
+        new_rows, new_columns = self._new_cells(map_id, x, y)
+        self.last_location = (map_id, x, y)
+
+        all_rows = np.arange(WINDOW_HEIGHT)
+        all_columns = np.arange(WINDOW_WIDTH)
+        # A diagonal move scrolls in a strip of rows and a strip of columns
+        strips = []
+        if len(new_rows) > 0:
+            strips.append((new_rows, all_columns))
+        if len(new_columns) > 0 and len(new_rows) < WINDOW_HEIGHT:
+            strips.append((all_rows, new_columns))
+
+        for rows, columns in strips:
+            map_rows = rows + y - PLAYER_ROW
+            map_columns = columns + x - PLAYER_COLUMN
+            row_mask = (map_rows >= 0) & (map_rows < map_shape[0])
+            column_mask = (map_columns >= 0) & (map_columns < map_shape[1])
+            if not row_mask.any() or not column_mask.any():
+                continue
+
+            cells = read_cells(rows[row_mask], columns[column_mask])
+            canvas[np.ix_(map_rows[row_mask], map_columns[column_mask])] = cells
+
+    def minimap(self, map_id: int, x: int, y: int) -> np.ndarray:
+        # (crop_height, crop_width) view centred on the player - each cell pools scale x scale map cells
+        self.crop.fill(UNSEEN)
+        canvas = self.canvases.get(map_id)
+        if canvas is None:
+            return self.crop
+
+        height = self.crop_height * self.scale
+        width = self.crop_width * self.scale
+        top = y - height // 2
+        left = x - width // 2
+
+        window = np.zeros((height, width), dtype=np.uint8)
+        source_top, source_left = max(top, 0), max(left, 0)
+        source_bottom = min(top + height, canvas.shape[0])
+        source_right = min(left + width, canvas.shape[1])
+        if source_bottom > source_top and source_right > source_left:
+            window[
+                source_top - top : source_bottom - top,
+                source_left - left : source_right - left,
+            ] = canvas[source_top:source_bottom, source_left:source_right]
+
+        pooled = window.reshape(self.crop_height, self.scale, self.crop_width, self.scale)
+        np.max(pooled, axis=(1, 3), out=self.crop)
+        return self.crop
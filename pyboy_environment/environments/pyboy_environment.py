@@ -1,4 +1,12 @@
+import copy
+import io
+import logging
+import multiprocessing
+import os
+import pickle
+import zlib
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
 from pathlib import Path
 
@@ -6,6 +14,24 @@ import cv2
 import numpy as np
 from pyboy import PyBoy
 
+from pyboy_environment.environments.macro_actions import ButtonSchedule, MacroAction
+from pyboy_environment.environments.watchpoints import WatchpointSet
+from pyboy_environment.environments.frame_stack import FrameStack
+from pyboy_environment.environments.reward_ledger import RewardLedger
+from pyboy_environment.environments.telemetry import Telemetry
+from pyboy_environment.environments.ram_observation import RamObservation
+from pyboy_environment.environments.ram_tracker import RamTracker
+from pyboy_environment.environments import rollout
+
+# Attributes holding the emulator - never copied into clones or rollout workers
+EMULATOR_ATTRIBUTES = ("pyboy", "screen")
+
+# Live resources that copies start without
+DETACHED_ATTRIBUTES = {"telemetry": None, "rollout_pool": None, "rollout_workers": 0}
+
+# Format of the pickled environment - see __getstate__
+ENV_STATE_VERSION = 1
+
 
 class PyboyEnvironment(metaclass=ABCMeta):
 
@@ -20,6 +46,7 @@ class PyboyEnvironment(metaclass=ABCMeta):
         release_button: list,
         emulation_speed: int = 0,
         headless: bool = False,
+        macro_actions: list[MacroAction] | None = None,
     ) -> None:
         self.task = task
         self.domain = domain
@@ -34,37 +61,214 @@ class PyboyEnvironment(metaclass=ABCMeta):
 
         self.release_button = release_button
 
+        self.macro_actions = [] if macro_actions is None else macro_actions
+
         self.act_freq = act_freq
 
-        head = "null" if headless else "SDL2"
-        self.pyboy = PyBoy(
-            self.rom_path,
-            window=head,
-        )
+        self.headless = headless
+        self.emulation_speed = emulation_speed
+        # Rollout workers skip rendering - nothing looks at their screens
+        self.render_frames = True
+        self._create_emulator()
 
         self.prior_game_stats = self._generate_game_stats()
-        self.screen = self.pyboy.screen
 
         self.steps = 0
 
         self.seed = 0
 
-        self.pyboy.set_emulation_speed(emulation_speed)
+        # Extra per-step details for logging - step() keeps its four value return
+        self.step_info = {}
+
+        # Watchpoints end the current action early - the names that fired are kept for the task
+        self.watchpoints = WatchpointSet()
+        self.triggered_watchpoints = []
+
+        # Whole-RAM observation for RAM based agents - see set_ram_observation
+        self.ram_observer = RamObservation()
+
+        # Optional per-step WRAM history for finding event addresses - see enable_ram_tracker
+        self.ram_tracker = None
+
+        # Optional stack of the last K observations - see set_frame_stack
+        self.frame_stack = None
+        self.frame_stack_source = None
+
+        # Named reward components of the current episode and the summary of the last one
+        self.reward_ledger = RewardLedger()
+        self.episode_reward_summary = {}
+
+        # Changes in the game stats since the previous step - see _compute_stats_delta
+        self.stats_delta = None
+
+        # Optional counters and reward/episode sketches flushed to disk - see enable_telemetry
+        self.telemetry = None
+
+        # Worker processes for lookahead - see rollout
+        self.rollout_pool = None
+        self.rollout_workers = 0
 
         self.reset()
 
+    def _create_emulator(self) -> None:
+        head = "null" if self.headless else "SDL2"
+        self.pyboy = PyBoy(
+            self.rom_path,
+            window=head,
+        )
+        self.screen = self.pyboy.screen
+        self.pyboy.set_emulation_speed(self.emulation_speed)
+
+    def save_emulator_state(self) -> bytes:
+        with io.BytesIO() as emulator_state:
+            self.pyboy.save_state(emulator_state)
+            return emulator_state.getvalue()
+
+    def load_emulator_state(self, emulator_state: bytes) -> None:
+        with io.BytesIO(emulator_state) as state:
+            self.pyboy.load_state(state)
+
+    def _python_state(self, include_tools: bool = True) -> dict:
+        # Everything but the emulator - the RAM tracker history is left out of rollouts unless include_tools
+        state = {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in EMULATOR_ATTRIBUTES and name != "pending_emulator_state"
+        }
+        state.update(DETACHED_ATTRIBUTES)
+        if not include_tools:
+            state["ram_tracker"] = None
+        return state
+
+    def __getstate__(self) -> dict:
+        # Python-side fields plus the compressed savestate - the emulator itself is never pickled
+        emulator_state = self.__dict__.get("pending_emulator_state")
+        if emulator_state is None:
+            emulator_state = zlib.compress(self.save_emulator_state())
+
+        return {
+            "version": ENV_STATE_VERSION,
+            "fields": self._python_state(),
+            "emulator": emulator_state,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        if state["version"] != ENV_STATE_VERSION:
+            raise ValueError(
+                f"Unsupported environment state version {state['version']} - expected {ENV_STATE_VERSION}"
+            )
+
+        self.__dict__.update(state["fields"])
+        # The emulator is only started when first used - see __getattr__
+        self.pending_emulator_state = state["emulator"]
+
+    def restore(self, state: dict) -> None:
+        # Loads a __getstate__ dict into this environment, keeping its running emulator and live resources
+        if state["version"] != ENV_STATE_VERSION:
+            raise ValueError(
+                f"Unsupported environment state version {state['version']} - expected {ENV_STATE_VERSION}"
+            )
+
+        fields = {
+            name: value for name, value in state["fields"].items() if name not in DETACHED_ATTRIBUTES
+        }
+        self.__dict__.update(fields)
+        self.load_emulator_state(zlib.decompress(state["emulator"]))
+
+    @staticmethod
+    def loads(data: bytes, headless: bool | None = True) -> "PyboyEnvironment":
+        # Unpickles an environment - headless overrides the pickled window setting like clone, None keeps it
+        env = pickle.loads(data)
+        if headless is not None:
+            env.headless = headless
+        return env
+
+    def __getattr__(self, name: str):
+        # Only called for missing attributes - starts the emulator of an unpickled environment on first use
+        # The emulator opens with the pickled headless setting, so a windowed environment unpickled with
+        # pickle.loads opens an SDL2 window - use PyboyEnvironment.loads to start it headless instead
+        if name in EMULATOR_ATTRIBUTES and "pending_emulator_state" in self.__dict__:
+            emulator_state = self.__dict__.pop("pending_emulator_state")
+            self._create_emulator()
+            self.load_emulator_state(zlib.decompress(emulator_state))
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def clone(self, headless: bool = True) -> "PyboyEnvironment":
+        # Independent copy at the current step with its own emulator - the live environment is left untouched
+        twin = object.__new__(type(self))
+        twin.__dict__.update(copy.deepcopy(self._python_state()))
+        twin.headless = headless
+        twin._create_emulator()
+        twin.load_emulator_state(self.save_emulator_state())
+        return twin
+
+    def rollout(self, actions_batch: list, workers: int | None = None) -> list[dict]:
+        # Plays each action sequence from the current state on worker emulators - workers=0 runs in process
+        snapshot = pickle.dumps(
+            (type(self), self._python_state(False), self.save_emulator_state()),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        if workers == 0:
+            results = []
+            env = None
+            for actions in actions_batch:
+                env_class, python_state, emulator_state = pickle.loads(snapshot)
+                env = rollout.restore_environment(env_class, python_state, emulator_state, env)
+                results.append(rollout.run_sequence(env, actions))
+            if env is not None:
+                env.pyboy.stop(save=False)
+            return results
+
+        workers = os.cpu_count() if workers is None else workers
+        if self.rollout_pool is None or self.rollout_workers != workers:
+            self.close_rollouts()
+            # Spawned so workers don't inherit the live emulator
+            self.rollout_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self.rollout_workers = workers
+
+        return list(
+            self.rollout_pool.map(
+                rollout.rollout_worker,
+                [snapshot] * len(actions_batch),
+                actions_batch,
+            )
+        )
+
+    def close_rollouts(self) -> None:
+        if self.rollout_pool is not None:
+            self.rollout_pool.shutdown()
+            self.rollout_pool = None
+
     def set_seed(self, seed: int) -> None:
         self.seed = seed
         # There isn't a random element to set that I am aware of...
 
     def reset(self) -> np.ndarray:
+        if self.telemetry is not None:
+            self.telemetry.record_reset(self.steps)
+
         self.steps = 0
 
+        if self.reward_ledger.length > 0:
+            self.episode_reward_summary = self.reward_ledger.summary()
+        self.reward_ledger.reset()
+
         with open(self.init_path, "rb") as f:
             self.pyboy.load_state(f)
 
         self.prior_game_stats = self._generate_game_stats()
 
+        if self.ram_tracker is not None:
+            self.ram_tracker.clear(self.pyboy.memory)
+
+        if self.frame_stack is not None:
+            self.frame_stack.clear()
+            self._push_frame_stack()
+
         return self._get_state()
 
     def grab_frame(self, height: int = 240, width: int = 300) -> np.ndarray:
@@ -77,23 +281,185 @@ class PyboyEnvironment(metaclass=ABCMeta):
     def game_area(self) -> np.ndarray:
         return self.pyboy.game_area()
 
+    def enable_telemetry(
+        self,
+        path: str,
+        worker_id: str | None = None,
+        flush_interval: float = 30.0,
+        sinks: tuple[str, ...] = ("jsonl",),
+    ) -> Telemetry:
+        self.telemetry = Telemetry(path, worker_id, flush_interval, sinks)
+        return self.telemetry
+
+    def enable_ram_tracker(self, capacity: int = 1024) -> RamTracker:
+        self.ram_tracker = RamTracker(capacity)
+        self.ram_tracker.clear(self.pyboy.memory)
+        return self.ram_tracker
+
+    def set_ram_observation(
+        self,
+        include_hram: bool = False,
+        address_mask: np.ndarray | list[int] | None = None,
+    ) -> None:
+        self.ram_observer = RamObservation(include_hram, address_mask)
+
+    def ram_observation(self, copy: bool = True) -> np.ndarray:
+        # uint8 WRAM (+ HRAM) - copy=False returns a read-only view that the next read overwrites
+        return self.ram_observer.read(self.pyboy.memory, copy)
+
+    def set_frame_stack(self, size: int, source: str = "game_area") -> None:
+        sources = self._frame_stack_sources()
+        if source not in sources:
+            raise ValueError(
+                f"Unknown frame stack source: {source} - expected one of {list(sources)}"
+            )
+
+        self.frame_stack = FrameStack(size)
+        # Kept by name so the environment stays copyable
+        self.frame_stack_source = source
+        self._push_frame_stack()
+
+    def stacked_observation(self) -> np.ndarray:
+        # Read-only (K, ...) view of the last K observations, oldest first
+        return self.frame_stack.view()
+
+    def _frame_stack_sources(self) -> dict:
+        return {
+            "frame": lambda: self.screen.ndarray,
+            "game_area": self.game_area,
+            "ram": lambda: self.ram_observation(copy=False),
+        }
+
+    def _push_frame_stack(self) -> None:
+        if self.frame_stack is not None:
+            self.frame_stack.push(self._frame_stack_sources()[self.frame_stack_source]())
+
     def step(self, action) -> tuple:
         self.steps += 1
+        self.step_info = {}
+
+        self.triggered_watchpoints = []
+        self.watchpoints.arm(self.pyboy.memory)
 
-        self._run_action_on_emulator(action)
+        macro_action = self._decode_macro_action(action)
+        if macro_action is not None:
+            self.step_info["macro_action"] = macro_action.name
+            reward, done, truncated = self._run_macro_action(macro_action)
+            self._push_frame_stack()
+            state = self._get_state()
+        else:
+            self._run_action_on_emulator(action)
+            self._push_frame_stack()
 
-        state = self._get_state()
+            state = self._get_state()
 
-        current_game_stats = self._generate_game_stats()
-        reward = self._calculate_reward(current_game_stats)
+            current_game_stats = self._generate_game_stats()
+            self.stats_delta = self._compute_stats_delta(current_game_stats)
+            reward = self._calculate_reward(current_game_stats)
 
-        done = self._check_if_done(current_game_stats)
-        truncated = self._check_if_truncated(current_game_stats)
+            done = self._check_if_done(current_game_stats)
+            truncated = self._check_if_truncated(current_game_stats)
 
-        self.prior_game_stats = current_game_stats
+            self.prior_game_stats = current_game_stats
+
+        if self.ram_tracker is not None:
+            self.ram_tracker.record(self.pyboy.memory, reward)
+
+        if self.telemetry is not None:
+            self.telemetry.record_step(reward)
 
         return state, reward, done, truncated
 
+    def _compute_stats_delta(self, game_stats: dict):
+        # Tasks that track per-step changes diff game_stats against self.prior_game_stats here
+        return None
+
+    def _decode_macro_action(self, action) -> MacroAction | None:
+        # Tasks with macro actions map the relevant part of the action space onto self.macro_actions
+        return None
+
+    def _run_macro_action(self, macro_action: MacroAction) -> tuple[float, bool, bool]:
+        reward = 0.0
+        done = False
+        truncated = False
+        for segment in macro_action.segments:
+            self._run_button_schedule(segment)
+
+            current_game_stats = self._generate_game_stats()
+            self.stats_delta = self._compute_stats_delta(current_game_stats)
+            reward += self._calculate_reward(current_game_stats)
+
+            done = self._check_if_done(current_game_stats)
+            truncated = self._check_if_truncated(current_game_stats)
+
+            self.prior_game_stats = current_game_stats
+
+            if done or truncated or self.triggered_watchpoints:
+                break
+
+        return reward, done, truncated
+
+    def _run_button_schedule(self, schedule: ButtonSchedule) -> None:
+        frame = 0
+        for event_frame, event in schedule.events:
+            if event_frame > frame:
+                if not self._tick_frames(event_frame - frame):
+                    break
+                frame = event_frame
+            self.pyboy.send_input(event)
+        else:
+            if schedule.frames > frame:
+                self._tick_frames(schedule.frames - frame)
+            return
+
+        # Cut short by a watchpoint - let go of anything the schedule left pressed
+        for release in self.release_button:
+            self.pyboy.send_input(release)
+
+    def register_watchpoint(
+        self,
+        name: str,
+        addresses: int | list[int],
+        condition: str = "changed",
+        value: int = 0,
+    ) -> None:
+        self.watchpoints.register(name, addresses, condition, value)
+
+    def _tick_frames(self, count: int, render: bool = True) -> bool:
+        # Returns False if a watchpoint fired, in which case the rest of the step's frames are skipped
+        if self.triggered_watchpoints:
+            return False
+
+        render = render and self.render_frames
+
+        if len(self.watchpoints) == 0:
+            for _ in range(count):
+                self.pyboy.tick(1, render)
+            return True
+
+        for _ in range(count):
+            self.pyboy.tick(1, render)
+            triggered = self.watchpoints.check(self.pyboy.memory)
+            if triggered:
+                self.triggered_watchpoints = triggered
+                self.step_info["watchpoints"] = triggered
+                return False
+        return True
+
+    def _record_rewards(self, reward_components: dict[str, float]) -> float:
+        # Records the components of one reward calculation and returns their sum
+        total = self.reward_ledger.record(reward_components)
+
+        step_rewards = self.step_info.setdefault("reward_components", {})
+        for name, reward in reward_components.items():
+            step_rewards[name] = step_rewards.get(name, 0) + reward
+
+        if logging.root.isEnabledFor(logging.DEBUG):
+            for name, reward in reward_components.items():
+                logging.debug("%s reward: %s", name, reward)
+
+        return total
+
     def _read_m(self, addr: int) -> int:
         return self.pyboy.memory[addr]
 
@@ -0,0 +1,94 @@
+"""
+Whole-RAM observations for RAM based agents.
+
+Work RAM (and optionally high RAM) is read with one slice of pyboy.memory per region and written into a
+preallocated uint8 buffer, instead of one _read_m call per address. PyBoy 2 does not expose its RAM arrays to
+Python, so a single bulk copy per region is the cheapest read available. An optional address mask selects the
+informative bytes with one precomputed gather.
+"""
+
+import numpy as np
+
+WRAM_START = 0xC000
+WRAM_END = 0xE000
+WRAM_SIZE = WRAM_END - WRAM_START
+
+HRAM_START = 0xFF80
+HRAM_END = 0xFFFF
+HRAM_SIZE = HRAM_END - HRAM_START
+
+
+def read_region(memory, start: int, end: int, out: np.ndarray) -> np.ndarray:
+    # bytes() packs the slice in C - several times faster than converting the list with np.array
+    out[:] = np.frombuffer(bytes(memory[start:end]), dtype=np.uint8)
+    return out
+
+
+class RamObservation:
+    def __init__(
+        self,
+        include_hram: bool = False,
+        address_mask: np.ndarray | list[int] | None = None,
+    ) -> None:
+        self.include_hram = include_hram
+
+        size = WRAM_SIZE + (HRAM_SIZE if include_hram else 0)
+        self.buffer = np.zeros(size, dtype=np.uint8)
+        self.wram = self.buffer[:WRAM_SIZE]
+        self.hram = self.buffer[WRAM_SIZE:]
+
+        self.indices = None
+        self.selected = None
+        if address_mask is not None:
+            self.indices = self._mask_indices(np.asarray(address_mask))
+            self.selected = np.zeros(len(self.indices), dtype=np.uint8)
+
+    @property
+    def size(self) -> int:
+        return len(self.buffer) if self.indices is None else len(self.indices)
+
+    def addresses(self) -> np.ndarray:
+        # Memory address of each byte of the observation
+        addresses = np.arange(WRAM_START, WRAM_END)
+        if self.include_hram:
+            addresses = np.concatenate([addresses, np.arange(HRAM_START, HRAM_END)])
+        return addresses if self.indices is None else addresses[self.indices]
+
+    def _mask_indices(self, address_mask: np.ndarray) -> np.ndarray:
+        # Either a boolean mask over the observed bytes or a list of memory addresses
+        if address_mask.dtype == bool:
+            if len(address_mask) != len(self.buffer):
+                raise ValueError(
+                    f"Address mask length {len(address_mask)} does not match the observation size {len(self.buffer)}"
+                )
+            return np.flatnonzero(address_mask)
+
+        addresses = address_mask.astype(np.int64)
+        indices = addresses - WRAM_START
+        in_hram = (addresses >= HRAM_START) & (addresses < HRAM_END)
+        indices[in_hram] = addresses[in_hram] - HRAM_START + WRAM_SIZE
+
+        in_wram = (addresses >= WRAM_START) & (addresses < WRAM_END)
+        valid = in_wram | (in_hram & self.include_hram)
+        if not valid.all():
+            raise ValueError(
+                f"Addresses outside the observed RAM: {[hex(a) for a in addresses[~valid]]}"
+            )
+        return indices
+
+    def read(self, memory, copy: bool = True) -> np.ndarray:
+        read_region(memory, WRAM_START, WRAM_END, self.wram)
+        if self.include_hram:
+            read_region(memory, HRAM_START, HRAM_END, self.hram)
+
+        observation = self.buffer
+        if self.indices is not None:
+            observation = np.take(self.buffer, self.indices, out=self.selected)
+
+        if copy:
+            return observation.copy()
+
+        # The view is overwritten by the next read
+        view = observation.view()
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,108 @@
+"""
+Records work RAM every step to find the addresses behind game events.
+
+Each step costs one bulk copy of WRAM into a ring buffer and one XOR against the previous snapshot. Queries
+over the recorded episode - change frequencies, bytes that changed exactly when another byte changed, bytes
+whose changes correlate with reward - are answered with vectorised reductions over the XOR masks.
+"""
+
+import numpy as np
+
+from pyboy_environment.environments.ram_observation import (
+    WRAM_END,
+    WRAM_SIZE,
+    WRAM_START,
+    read_region,
+)
+
+# Steps kept - each costs 16 KB
+DEFAULT_CAPACITY = 1024
+
+
+class RamTracker:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+
+        self.snapshots = np.zeros((capacity, WRAM_SIZE), dtype=np.uint8)
+        self.changes = np.zeros((capacity, WRAM_SIZE), dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+
+        # Snapshot taken on reset that the first step is diffed against
+        self.baseline = np.zeros(WRAM_SIZE, dtype=np.uint8)
+
+        self.position = 0
+        self.length = 0
+
+    def clear(self, memory) -> None:
+        read_region(memory, WRAM_START, WRAM_END, self.baseline)
+        self.position = 0
+        self.length = 0
+
+    def record(self, memory, reward: float = 0.0) -> None:
+        slot = self.position
+        previous = self.snapshots[slot - 1] if self.length > 0 else self.baseline
+
+        snapshot = read_region(memory, WRAM_START, WRAM_END, self.snapshots[slot])
+        np.bitwise_xor(snapshot, previous, out=self.changes[slot])
+        self.rewards[slot] = reward
+
+        self.position = (slot + 1) % self.capacity
+        self.length = min(self.length + 1, self.capacity)
+
+    def _order(self) -> np.ndarray:
+        # Ring slots of the recorded steps, oldest first
+        return np.arange(self.position - self.length, self.position) % self.capacity
+
+    def _changed(self) -> np.ndarray:
+        # (steps, WRAM_SIZE) bool - True where a byte changed on that step
+        return self.changes[self._order()] != 0
+
+    def _offset(self, address: int) -> int:
+        if not WRAM_START <= address < WRAM_END:
+            raise ValueError(f"Address outside work RAM: {hex(address)}")
+        return address - WRAM_START
+
+    def values(self, address: int) -> np.ndarray:
+        # Value of one byte on each recorded step
+        return self.snapshots[self._order(), self._offset(address)]
+
+    def change_frequency(self) -> np.ndarray:
+        # Fraction of the recorded steps on which each byte changed, indexed by address - WRAM_START
+        if self.length == 0:
+            return np.zeros(WRAM_SIZE)
+        return np.count_nonzero(self.changes[self._order()], axis=0) / self.length
+
+    def changed_mask(self) -> np.ndarray:
+        # Bits of each byte that flipped at least once over the recorded steps
+        return np.bitwise_or.reduce(self.changes[self._order()], axis=0)
+
+    def changed_addresses(self) -> np.ndarray:
+        return np.flatnonzero(self.changed_mask()) + WRAM_START
+
+    def changed_with(self, address: int) -> np.ndarray:
+        # Addresses that changed on exactly the same steps as address, e.g. everything that changes with map_id
+        changed = self._changed()
+        target = changed[:, self._offset(address)]
+        if not target.any():
+            return np.zeros(0, dtype=np.int64)
+
+        matches = (changed == target[:, np.newaxis]).all(axis=0)
+        matches[self._offset(address)] = False
+        return np.flatnonzero(matches) + WRAM_START
+
+    def correlated_with_reward(self, top: int = 20) -> tuple[np.ndarray, np.ndarray]:
+        # Pearson correlation between each byte changing and the step's reward - strongest first
+        changed = self._changed().astype(np.float32)
+        rewards = self.rewards[self._order()].astype(np.float32)
+
+        changed -= changed.mean(axis=0)
+        rewards -= rewards.mean()
+
+        scale = np.sqrt((changed**2).sum(axis=0) * (rewards**2).sum())
+        covariance = changed.T @ rewards
+        correlation = np.divide(
+            covariance, scale, out=np.zeros_like(covariance), where=scale > 0
+        )
+
+        order = np.argsort(-np.abs(correlation))[:top]
+        return order + WRAM_START, correlation[order]
@@ -0,0 +1,72 @@
+"""
+Per-episode record of named reward components.
+
+Each reward calculation writes one row into a preallocated NumPy array so the breakdown of an episode can be
+summarised with a few vectorised reductions instead of logging every component on every step.
+"""
+
+import numpy as np
+
+# Rows preallocated per episode - doubled if an episode runs longer
+INITIAL_CAPACITY = 1024
+
+
+class RewardLedger:
+    def __init__(self, capacity: int = INITIAL_CAPACITY) -> None:
+        self.components = []
+        self.columns = {}
+
+        self.rewards = np.zeros((capacity, 0), dtype=np.float64)
+        self.length = 0
+
+    def reset(self) -> None:
+        self.length = 0
+
+    def record(self, reward_components: dict[str, float]) -> float:
+        if self.length == self.rewards.shape[0]:
+            self.rewards = np.concatenate([self.rewards, np.zeros_like(self.rewards)])
+
+        row = self.rewards[self.length]
+        row.fill(0)
+        total = 0.0
+        for name, reward in reward_components.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self._add_component(name)
+                row = self.rewards[self.length]
+            row[column] = reward
+            total += reward
+
+        self.length += 1
+        return total
+
+    def _add_component(self, name: str) -> int:
+        self.columns[name] = len(self.components)
+        self.components.append(name)
+        self.rewards = np.pad(self.rewards, ((0, 0), (0, 1)))
+        return self.columns[name]
+
+    def episode_rewards(self) -> np.ndarray:
+        # (steps, components) view of the current episode - columns follow self.components
+        return self.rewards[: self.length]
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        rewards = self.episode_rewards()
+        if self.length == 0:
+            return {}
+
+        totals = rewards.sum(axis=0)
+        means = rewards.mean(axis=0)
+        minimums = rewards.min(axis=0)
+        maximums = rewards.max(axis=0)
+        non_zero = np.count_nonzero(rewards, axis=0)
+        return {
+            name: {
+                "total": float(totals[i]),
+                "mean": float(means[i]),
+                "min": float(minimums[i]),
+                "max": float(maximums[i]),
+                "non_zero_steps": int(non_zero[i]),
+            }
+            for i, name in enumerate(self.components)
+        }
@@ -0,0 +1,58 @@
+"""
+Lookahead rollouts on worker emulators.
+
+The live environment's savestate and Python-side fields are serialised once and fanned out to worker processes.
+Each worker keeps one headless environment per task class, restores the snapshot into it and plays a candidate
+action sequence without rendering. The live environment is only read from.
+"""
+
+import pickle
+
+# Environment per task class, reused across rollouts within a worker process
+_WORKER_ENVIRONMENTS = {}
+
+
+def restore_environment(env_class, python_state: dict, emulator_state: bytes, env=None):
+    # Reuses env's emulator if given - otherwise a headless one is started
+    if env is None:
+        env = object.__new__(env_class)
+        env.__dict__.update(python_state)
+        env.headless = True
+        env._create_emulator()
+    else:
+        env.__dict__.update(python_state)
+
+    env.render_frames = False
+    env.load_emulator_state(emulator_state)
+    return env
+
+
+def run_sequence(env, actions) -> dict:
+    rewards = []
+    state = None
+    done = False
+    truncated = False
+    for action in actions:
+        state, reward, done, truncated = env.step(action)
+        rewards.append(reward)
+        if done or truncated:
+            break
+
+    return {
+        "rewards": rewards,
+        "total_reward": float(sum(rewards)),
+        "steps": len(rewards),
+        "done": done,
+        "truncated": truncated,
+        "final_state": state,
+        "final_stats": env.prior_game_stats,
+    }
+
+
+def rollout_worker(snapshot: bytes, actions) -> dict:
+    env_class, python_state, emulator_state = pickle.loads(snapshot)
+    env = restore_environment(
+        env_class, python_state, emulator_state, _WORKER_ENVIRONMENTS.get(env_class)
+    )
+    _WORKER_ENVIRONMENTS[env_class] = env
+    return run_sequence(env, actions)
@@ -0,0 +1,269 @@
+"""
+Content-addressed store for large libraries of PyBoy savestates.
+
+Savestates are split into fixed-size chunks. PyBoy writes a fixed layout, so unchanged RAM pages land on the same
+chunk boundaries in every state. Each chunk is compressed and stored once, under its hash, and a state is a small
+manifest listing its chunk hashes. Restores go through an LRU cache of decompressed chunks, so states that share
+most of their pages are rebuilt almost entirely from memory. Chunks are stored per codec, so a manifest always
+finds its chunks compressed the way it expects.
+
+    python -m pyboy_environment.environments.savestate_store -s STORE_PATH [-a STATE_FILE ...]
+"""
+
+import argparse
+import bz2
+import hashlib
+import io
+import json
+import logging
+import lzma
+import os
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CHUNK_SIZE = 4096
+
+# Decompressed chunks kept in memory - 64 MB at the default chunk size
+DEFAULT_CACHE_CHUNKS = 16384
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+}
+
+MANIFEST_VERSION = 1
+
+
+def _write_atomic(file_path: str, data: bytes) -> None:
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, file_path)
+
+
+class SavestateStore:
+    def __init__(
+        self,
+        store_path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        codec: str = "zlib",
+        cache_chunks: int = DEFAULT_CACHE_CHUNKS,
+    ) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec: {codec} - expected one of {list(CODECS)}")
+
+        self.store_path = store_path
+        self.chunk_path = f"{store_path}/chunks"
+        self.manifest_path = f"{store_path}/states"
+        os.makedirs(self.chunk_path, exist_ok=True)
+        os.makedirs(self.manifest_path, exist_ok=True)
+
+        self.chunk_size = chunk_size
+        self.codec = codec
+
+        self.cache = OrderedDict()
+        self.cache_chunks = cache_chunks
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _chunk_file(self, chunk_hash: str, codec: str) -> str:
+        # Two level fan-out keeps directories small for large libraries
+        return f"{self.chunk_path}/{codec}/{chunk_hash[:2]}/{chunk_hash}"
+
+    def _manifest_file(self, name: str) -> str:
+        return f"{self.manifest_path}/{name}.json"
+
+    def names(self) -> list[str]:
+        return sorted(
+            file_name[: -len(".json")]
+            for file_name in os.listdir(self.manifest_path)
+            if file_name.endswith(".json")
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return os.path.exists(self._manifest_file(name))
+
+    def put(self, name: str, state: bytes) -> int:
+        # Stores state under name and returns the number of chunks that were not already in the store
+        compress, _ = CODECS[self.codec]
+
+        chunk_hashes = []
+        new_chunks = 0
+        for start in range(0, len(state), self.chunk_size):
+            chunk = state[start : start + self.chunk_size]
+            chunk_hash = hashlib.blake2b(chunk, digest_size=16).hexdigest()
+            chunk_hashes.append(chunk_hash)
+
+            chunk_file = self._chunk_file(chunk_hash, self.codec)
+            if os.path.exists(chunk_file):
+                continue
+
+            os.makedirs(os.path.dirname(chunk_file), exist_ok=True)
+            _write_atomic(chunk_file, compress(chunk))
+            new_chunks += 1
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "size": len(state),
+            "codec": self.codec,
+            "chunks": chunk_hashes,
+        }
+        _write_atomic(self._manifest_file(name), json.dumps(manifest).encode("utf-8"))
+        return new_chunks
+
+    def _read_manifest(self, name: str) -> dict:
+        with open(self._manifest_file(name), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        if manifest["version"] != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version {manifest['version']} for {name}")
+        return manifest
+
+    def _read_chunk(self, chunk_hash: str, codec: str) -> bytes:
+        # Decompressed chunks are the same whichever codec stored them - the cache is keyed by hash alone
+        chunk = self.cache.get(chunk_hash)
+        if chunk is not None:
+            self.cache.move_to_end(chunk_hash)
+            self.cache_hits += 1
+            return chunk
+
+        self.cache_misses += 1
+        _, decompress = CODECS[codec]
+        with open(self._chunk_file(chunk_hash, codec), "rb") as file:
+            chunk = decompress(file.read())
+
+        self.cache[chunk_hash] = chunk
+        if len(self.cache) > self.cache_chunks:
+            self.cache.popitem(last=False)
+        return chunk
+
+    def get(self, name: str) -> bytes:
+        manifest = self._read_manifest(name)
+        state = b"".join(
+            self._read_chunk(chunk_hash, manifest["codec"])
+            for chunk_hash in manifest["chunks"]
+        )
+        if len(state) != manifest["size"]:
+            raise ValueError(f"Savestate {name} is {len(state)} bytes - expected {manifest['size']}")
+        return state
+
+    def save(self, name: str, pyboy) -> int:
+        with io.BytesIO() as state:
+            pyboy.save_state(state)
+            return self.put(name, state.getvalue())
+
+    def restore(self, name: str, pyboy) -> None:
+        with io.BytesIO(self.get(name)) as state:
+            pyboy.load_state(state)
+
+    def delete(self, name: str) -> None:
+        # Chunks are shared - unreferenced ones are removed by collect_garbage
+        os.remove(self._manifest_file(name))
+
+    def _referenced_chunks(self) -> dict[tuple[str, str], int]:
+        references = {}
+        for name in self.names():
+            manifest = self._read_manifest(name)
+            for chunk_hash in manifest["chunks"]:
+                key = (manifest["codec"], chunk_hash)
+                references[key] = references.get(key, 0) + 1
+        return references
+
+    def _stored_chunks(self) -> dict[tuple[str, str], int]:
+        # (codec, hash) -> compressed size on disk
+        stored = {}
+        for codec in os.scandir(self.chunk_path):
+            if not codec.is_dir():
+                continue
+            for directory in os.scandir(codec.path):
+                if not directory.is_dir():
+                    continue
+                for entry in os.scandir(directory.path):
+                    if not entry.name.endswith(".tmp"):
+                        stored[(codec.name, entry.name)] = entry.stat().st_size
+        return stored
+
+    def collect_garbage(self) -> int:
+        referenced = self._referenced_chunks()
+        removed = 0
+        for codec, chunk_hash in self._stored_chunks():
+            if (codec, chunk_hash) not in referenced:
+                os.remove(self._chunk_file(chunk_hash, codec))
+                self.cache.pop(chunk_hash, None)
+                removed += 1
+        return removed
+
+    def disk_usage(self) -> dict[str, float]:
+        logical_bytes = 0
+        chunk_references = 0
+        manifest_bytes = 0
+        states = self.names()
+        for name in states:
+            manifest = self._read_manifest(name)
+            logical_bytes += manifest["size"]
+            chunk_references += len(manifest["chunks"])
+            manifest_bytes += os.path.getsize(self._manifest_file(name))
+
+        stored = self._stored_chunks()
+        chunk_bytes = sum(stored.values())
+        stored_bytes = chunk_bytes + manifest_bytes
+
+        return {
+            "states": len(states),
+            "logical_bytes": logical_bytes,
+            "stored_bytes": stored_bytes,
+            "chunk_bytes": chunk_bytes,
+            "manifest_bytes": manifest_bytes,
+            "chunk_references": chunk_references,
+            "unique_chunks": len(stored),
+            "dedup_ratio": chunk_references / len(stored) if stored else 0.0,
+            "space_saving": 1 - stored_bytes / logical_bytes if logical_bytes else 0.0,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-s", "--store_path", type=str, required=True)
+
+    parse_args.add_argument("-a", "--add", type=str, nargs="*", default=[])
+
+    parse_args.add_argument("-c", "--codec", type=str, default="zlib", choices=list(CODECS))
+
+    parse_args.add_argument("--gc", action="store_true")
+
+    return parse_args.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+
+    args = get_args()
+
+    store = SavestateStore(args.store_path, codec=args.codec)
+
+    for file_path in args.add:
+        with open(file_path, "rb") as file:
+            new_chunks = store.put(Path(file_path).stem, file.read())
+        logging.info(f"Added {file_path} - {new_chunks} new chunks")
+
+    if args.gc:
+        logging.info(f"Removed {store.collect_garbage()} unreferenced chunks")
+
+    usage = store.disk_usage()
+    logging.info(
+        f"{usage['states']} states - {usage['logical_bytes'] / 1e6:.2f} MB stored in {usage['stored_bytes'] / 1e6:.2f} MB "
+        f"({usage['space_saving']:.1%} saved)"
+    )
+    logging.info(
+        f"{usage['unique_chunks']} unique chunks for {usage['chunk_references']} references - "
+        f"{usage['dedup_ratio']:.1f}x deduplication"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+In-memory training telemetry for long running environments.
+
+Counters and streaming quantile sketches are updated on every step and periodically handed to a background
+thread which writes them to local files - a JSONL stream of snapshots and/or a Prometheus textfile for the
+node_exporter textfile collector. Use aggregate_telemetry.py to merge the JSONL files of many workers.
+"""
+
+import atexit
+import json
+import math
+import os
+import queue
+import socket
+import threading
+import time
+from pathlib import Path
+
+# Values closer to zero than this are counted in the zero bucket of a sketch
+MIN_INDEXABLE_VALUE = 1e-9
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileSketch:
+    # Mergeable quantile sketch with logarithmic buckets (DDSketch) - estimates are within relative_accuracy
+    # of the true value and memory depends only on the dynamic range of the values, not how many were added
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        if value > MIN_INDEXABLE_VALUE:
+            key = math.ceil(math.log(value) / self.log_gamma)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif value < -MIN_INDEXABLE_VALUE:
+            key = math.ceil(math.log(-value) / self.log_gamma)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zero += 1
+
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return math.nan
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(-self._bucket_value(key), self.min)
+
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self._bucket_value(key), self.max)
+
+        return self.max
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Can only merge sketches with the same relative accuracy")
+
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero += other.zero
+
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": self.positive.copy(),
+            "negative": self.negative.copy(),
+            "zero": self.zero,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        # JSON turns the integer bucket keys into strings
+        sketch.positive = {int(k): v for k, v in data["positive"].items()}
+        sketch.negative = {int(k): v for k, v in data["negative"].items()}
+        sketch.zero = data["zero"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def summary(self) -> dict[str, float]:
+        summary = {f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES}
+        summary["mean"] = self.sum / self.count if self.count else math.nan
+        summary["count"] = self.count
+        return summary
+
+
+class Telemetry:
+    def __init__(
+        self,
+        path: str,
+        worker_id: str | None = None,
+        flush_interval: float = 30.0,
+        sinks: tuple[str, ...] = ("jsonl",),
+    ) -> None:
+        for sink in sinks:
+            if sink not in ("jsonl", "prometheus"):
+                raise ValueError(f"Unknown telemetry sink: {sink}")
+
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.worker_id = (
+            f"{socket.gethostname()}-{os.getpid()}" if worker_id is None else worker_id
+        )
+        self.flush_interval = flush_interval
+        self.sinks = sinks
+
+        self.start_time = time.time()
+        self.counters = {"steps": 0, "resets": 0, "episodes": 0}
+        self.episode_reward = 0.0
+        self.step_reward = QuantileSketch()
+        self.episode_length = QuantileSketch()
+        self.episode_return = QuantileSketch()
+
+        self.last_flush = time.monotonic()
+        self.last_flush_steps = 0
+        self.last_flush_resets = 0
+
+        # Files are written by a background thread so flushing never blocks a step on disk
+        self.snapshots = queue.SimpleQueue()
+        self.writer = threading.Thread(target=self._write_snapshots, daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def record_step(self, reward: float) -> None:
+        self.counters["steps"] += 1
+        self.episode_reward += reward
+        self.step_reward.add(reward)
+
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def record_reset(self, episode_length: int) -> None:
+        self.counters["resets"] += 1
+        if episode_length > 0:
+            self.counters["episodes"] += 1
+            self.episode_length.add(episode_length)
+            self.episode_return.add(self.episode_reward)
+        self.episode_reward = 0.0
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        elapsed = max(now - self.last_flush, 1e-9)
+        steps_per_second = (self.counters["steps"] - self.last_flush_steps) / elapsed
+        resets_per_second = (self.counters["resets"] - self.last_flush_resets) / elapsed
+
+        self.last_flush = now
+        self.last_flush_steps = self.counters["steps"]
+        self.last_flush_resets = self.counters["resets"]
+
+        return {
+            "worker_id": self.worker_id,
+            "time": time.time(),
+            "uptime": time.time() - self.start_time,
+            "counters": self.counters.copy(),
+            "steps_per_second": steps_per_second,
+            "resets_per_second": resets_per_second,
+            "sketches": {
+                "step_reward": self.step_reward.to_dict(),
+                "episode_length": self.episode_length.to_dict(),
+                "episode_return": self.episode_return.to_dict(),
+            },
+        }
+
+    def flush(self) -> None:
+        self.snapshots.put(self.snapshot())
+
+    def close(self) -> None:
+        if not self.writer.is_alive():
+            return
+        self.flush()
+        self.snapshots.put(None)
+        self.writer.join()
+        atexit.unregister(self.close)
+
+    def _write_snapshots(self) -> None:
+        while True:
+            snapshot = self.snapshots.get()
+            if snapshot is None:
+                return
+            if "jsonl" in self.sinks:
+                self._write_jsonl(snapshot)
+            if "prometheus" in self.sinks:
+                self._write_prometheus(snapshot)
+
+    def _write_jsonl(self, snapshot: dict) -> None:
+        with open(self.path / f"{self.worker_id}.jsonl", "a", encoding="utf-8") as file:
+            file.write(json.dumps(snapshot) + "\n")
+
+    def _write_prometheus(self, snapshot: dict) -> None:
+        label = f'worker="{snapshot["worker_id"]}"'
+        lines = []
+        for name, value in snapshot["counters"].items():
+            lines.append(f"# TYPE pyboy_{name}_total counter")
+            lines.append(f"pyboy_{name}_total{{{label}}} {value}")
+
+        lines.append("# TYPE pyboy_steps_per_second gauge")
+        lines.append(f"pyboy_steps_per_second{{{label}}} {snapshot['steps_per_second']}")
+        lines.append("# TYPE pyboy_resets_per_second gauge")
+        lines.append(f"pyboy_resets_per_second{{{label}}} {snapshot['resets_per_second']}")
+
+        for name, data in snapshot["sketches"].items():
+            sketch = QuantileSketch.from_dict(data)
+            lines.append(f"# TYPE pyboy_{name} summary")
+            for q in QUANTILES:
+                lines.append(
+                    f'pyboy_{name}{{{label},quantile="{q}"}} {sketch.quantile(q)}'
+                )
+            lines.append(f"pyboy_{name}_sum{{{label}}} {sketch.sum}")
+            lines.append(f"pyboy_{name}_count{{{label}}} {sketch.count}")
+
+        # Write then rename so the collector never reads a half written file
+        prom_path = self.path / f"{self.worker_id}.prom"
+        tmp_path = prom_path.with_suffix(".prom.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, prom_path)
@@ -0,0 +1,143 @@
+"""
+RAM watchpoints checked between emulator ticks.
+
+Every watched byte is read in one vectorised pass per frame. A watchpoint over several addresses compares them as
+one big endian integer - the layout the game uses for HP, money and experience. Watchpoints are edge triggered - a
+watchpoint fires when its condition becomes true during a step, not while it stays true from an earlier step.
+"""
+
+import numpy as np
+
+CHANGED = 0
+EQUALS = 1
+NOT_EQUALS = 2
+BELOW = 3
+MASK = 4
+
+CONDITIONS = {
+    "changed": CHANGED,
+    "equals": EQUALS,
+    "not_equals": NOT_EQUALS,
+    "below": BELOW,
+    "mask": MASK,
+}
+
+# Addresses closer than this are read as one slice
+SPAN_GAP = 32
+
+# Widest value a watchpoint can assemble into a uint64
+MAX_WATCH_BYTES = 8
+
+
+class WatchpointSet:
+    def __init__(self) -> None:
+        self.names = []
+        self.watchpoints = []
+
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def register(
+        self,
+        name: str,
+        addresses: int | list[int],
+        condition: str = "changed",
+        value: int = 0,
+    ) -> None:
+        if condition not in CONDITIONS:
+            raise ValueError(f"Unknown watchpoint condition: {condition}")
+
+        if isinstance(addresses, int):
+            addresses = [addresses]
+        if not 0 < len(addresses) <= MAX_WATCH_BYTES:
+            raise ValueError(
+                f"Watchpoint {name} must watch 1 to {MAX_WATCH_BYTES} addresses: {len(addresses)}"
+            )
+        if not 0 <= value < 256 ** len(addresses):
+            raise ValueError(
+                f"Watchpoint {name} value {value} does not fit in {len(addresses)} byte(s)"
+            )
+
+        self.names.append(name)
+        self.watchpoints.append((list(addresses), CONDITIONS[condition], value))
+        self._build()
+
+    def clear(self) -> None:
+        self.names = []
+        self.watchpoints = []
+        self._build()
+
+    def _build(self) -> None:
+        addresses = []
+        weights = []
+        group_starts = []
+        for watch_addresses, _, _ in self.watchpoints:
+            group_starts.append(len(addresses))
+            addresses.extend(watch_addresses)
+            # Big endian - the first address is the most significant byte
+            weights.extend(256 ** power for power in reversed(range(len(watch_addresses))))
+
+        self.addresses = np.array(addresses, dtype=np.int32)
+        self.weights = np.array(weights, dtype=np.uint64)
+        self.group_starts = np.array(group_starts, dtype=np.intp)
+
+        conditions = np.array([condition for _, condition, _ in self.watchpoints], dtype=np.uint8)
+        self.values = np.array([value for _, _, value in self.watchpoints], dtype=np.uint64)
+        self.condition_masks = [
+            conditions == condition for condition in (CHANGED, EQUALS, NOT_EQUALS, BELOW)
+        ]
+
+        # Merge nearby addresses into contiguous slices so each frame costs a few bulk reads
+        self.spans = []
+        for address in sorted(set(addresses)):
+            if self.spans and address - self.spans[-1][1] < SPAN_GAP:
+                self.spans[-1][1] = address + 1
+            else:
+                self.spans.append([address, address + 1])
+
+        self.span_indices = []
+        for start, end in self.spans:
+            in_span = (self.addresses >= start) & (self.addresses < end)
+            self.span_indices.append(
+                (np.nonzero(in_span)[0], self.addresses[in_span] - start)
+            )
+
+        self.baseline = np.zeros(len(self.names), dtype=np.uint64)
+        self.armed_state = np.zeros(len(self.names), dtype=bool)
+
+    def _read(self, memory) -> np.ndarray:
+        # Value of every watchpoint, its bytes assembled into one integer
+        current = np.empty(len(self.addresses), dtype=np.uint64)
+        for (start, end), (indices, offsets) in zip(self.spans, self.span_indices):
+            span = np.array(memory[start:end], dtype=np.uint64)
+            current[indices] = span[offsets]
+        return np.add.reduceat(current * self.weights, self.group_starts)
+
+    def _evaluate(self, current: np.ndarray) -> np.ndarray:
+        return np.select(
+            self.condition_masks,
+            [
+                current != self.baseline,
+                current == self.values,
+                current != self.values,
+                current < self.values,
+            ],
+            default=(current & self.values) != 0,
+        )
+
+    def arm(self, memory) -> None:
+        # Snapshot at the start of a step - the reference for "changed" and for the edge trigger
+        if len(self.names) == 0:
+            return
+        self.baseline = self._read(memory)
+        self.armed_state = self._evaluate(self.baseline)
+
+    def check(self, memory) -> list[str]:
+        if len(self.names) == 0:
+            return []
+        triggered = self._evaluate(self._read(memory)) & ~self.armed_state
+        if not triggered.any():
+            return []
+        return [self.names[i] for i in np.nonzero(triggered)[0]]
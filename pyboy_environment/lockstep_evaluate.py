@@ -0,0 +1,164 @@
+"""
+Evaluates one model on several environments stepped in lockstep.
+
+Every step the states of all environments are gathered into one batch for a single policy forward pass and
+the actions are scattered back. Each environment is offset by a seeded number of idle frames after reset so the
+game's frame-timing based RNG - and therefore the trajectories - differ between them. The per-environment final
+stats are reported alongside their mean and standard deviation.
+"""
+
+import argparse
+import json
+import logging
+
+import numpy as np
+import torch
+
+import cares_reinforcement_learning.util.configurations as configurations
+from cares_reinforcement_learning.util.network_factory import NetworkFactory
+from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
+
+logging.basicConfig(level=logging.INFO)
+
+# Upper bound on the idle frames used to desynchronise the environments
+MAX_OFFSET_FRAMES = 600
+
+# Algorithms with a known actor output - everything else is evaluated one state at a time
+BATCHED_ACTORS = {
+    "DDPG": "deterministic",
+    "TD3": "deterministic",
+    "SAC": "stochastic",
+}
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-p", "--model_path", type=str, required=True)
+
+    parse_args.add_argument("-n", "--model_name", type=str, required=True)
+
+    parse_args.add_argument("-r", "--results_path", type=str, required=True)
+
+    parse_args.add_argument("-k", "--num_envs", type=int, default=8)
+
+    parse_args.add_argument("-s", "--num_steps", type=int, default=10000)
+
+    parse_args.add_argument("--seed", type=int, default=0)
+
+    parse_args.add_argument("--unbatched", action="store_true")
+
+    return parse_args.parse_args()
+
+
+def select_actions(agent, states, algorithm, batched=True):
+    # Only algorithms whose evaluation action is a plain actor forward pass are batched
+    if not batched or algorithm not in BATCHED_ACTORS:
+        return [agent.select_action_from_policy(state, evaluation=True) for state in states]
+
+    was_training = agent.actor_net.training
+    agent.actor_net.eval()
+    with torch.no_grad():
+        state_tensor = torch.FloatTensor(np.asarray(states)).to(agent.device)
+        actions = agent.actor_net(state_tensor)
+    agent.actor_net.train(was_training)
+
+    # Stochastic actors return (sample, log_prob, mean) - evaluation uses the deterministic mean
+    if BATCHED_ACTORS[algorithm] == "stochastic":
+        actions = actions[2]
+    return actions.cpu().numpy()
+
+
+def reset_with_offset(env, offset_frames):
+    env.reset()
+    env.pyboy.tick(offset_frames, False)
+    env.prior_game_stats = env._generate_game_stats()
+    return env._get_state()
+
+
+def summarise(final_stats):
+    metrics = {
+        "badges": [stats["badges"] for stats in final_stats],
+        "caught_pokemon": [stats["caught_pokemon"] for stats in final_stats],
+        "seen_pokemon": [stats["seen_pokemon"] for stats in final_stats],
+        "levels": [np.mean(stats["levels"]) for stats in final_stats],
+        "xp": [np.mean(stats["xp"]) for stats in final_stats],
+        "episodes": [stats["episodes"] for stats in final_stats],
+    }
+    return {
+        name: {"mean": float(np.mean(values)), "std": float(np.std(values))}
+        for name, values in metrics.items()
+    }
+
+
+def run_agent_lockstep(envs, agent, algorithm, num_steps, seed=0, batched=True):
+    rng = np.random.default_rng(seed)
+    offsets = rng.integers(0, MAX_OFFSET_FRAMES, size=len(envs))
+
+    states = [reset_with_offset(env, offset) for env, offset in zip(envs, offsets)]
+    episodes = [0] * len(envs)
+
+    for step in range(0, num_steps):
+        if step % 100 == 0:
+            logging.info(f"Step: {step}")
+
+        actions = select_actions(agent, states, algorithm, batched)
+        for i, env in enumerate(envs):
+            next_state, _, done, _ = env.step(actions[i])
+            states[i] = next_state
+            if done:
+                episodes[i] += 1
+                states[i] = reset_with_offset(env, offsets[i])
+
+    final_stats = []
+    for i, env in enumerate(envs):
+        stats = env._generate_game_stats()
+        stats["actions"] = step
+        stats["episodes"] = episodes[i]
+        stats["offset_frames"] = int(offsets[i])
+        final_stats.append(stats)
+
+    return final_stats
+
+
+def run(results_path, model_file_path, model_file_name, num_envs, num_steps, seed, batched):
+    algorithm = model_file_name.split("-")[0]
+
+    class_ = getattr(configurations, f"{algorithm}Config")
+    algorithm_config = class_()
+
+    network_factory = NetworkFactory()
+
+    envs = [PokemonBrock(act_freq=24, headless=True) for _ in range(num_envs)]
+
+    agent = network_factory.create_network(
+        envs[0].observation_space, envs[0].action_num, algorithm_config
+    )
+
+    agent.load_models(model_file_path, model_file_name)
+
+    final_stats = run_agent_lockstep(envs, agent, algorithm, num_steps, seed, batched)
+    summary = summarise(final_stats)
+
+    logging.info(f"Summary: {summary}")
+
+    with open(f"{results_path}/lockstep_results.json", "w", encoding="utf-8") as file:
+        json.dump({"environments": final_stats, "summary": summary}, file)
+
+
+def main():
+    args = get_args()
+
+    run(
+        args.results_path,
+        args.model_path,
+        args.model_name,
+        args.num_envs,
+        args.num_steps,
+        args.seed,
+        not args.unbatched,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Local, parallel replacement for the pull_results.py workflow. Submissions are read from a local directory laid
+out like the Google Drive folder:
+
+    submissions_path/UPI/requirements.txt
+    submissions_path/UPI/brock.py
+    submissions_path/UPI/<model folder>/<model files>
+
+The shared dependencies (cares_reinforcement_learning and this package's requirements) are installed once into a
+cached base virtualenv. Each submission gets a light virtualenv layered on top of the base through a .pth file,
+so only the packages a student added are installed - from a shared local wheel cache. Setup and evaluation run
+concurrently in two bounded pools and the time spent in each stage is reported per submission.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import venv
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO)
+
+REPO_PATH = Path(__file__).parent.parent
+
+
+def get_args():
+    parse_args = argparse.ArgumentParser()
+
+    parse_args.add_argument("-s", "--submissions_path", type=str, required=True)
+
+    parse_args.add_argument(
+        "-w",
+        "--work_path",
+        type=str,
+        default=f"{Path.home()}/submission_pipeline",
+    )
+
+    parse_args.add_argument(
+        "--cares_rl_path",
+        type=str,
+        default=f"{Path.home()}/workspace/cares_reinforcement_learning",
+    )
+
+    parse_args.add_argument("--setup_workers", type=int, default=4)
+
+    parse_args.add_argument("--eval_workers", type=int, default=os.cpu_count())
+
+    return parse_args.parse_args()
+
+
+def _run_command(command, log_path, cwd=None):
+    with open(log_path, "a", encoding="utf-8") as log:
+        log.write(f"$ {' '.join(str(part) for part in command)}\n")
+        log.flush()
+        subprocess.run(
+            command, stdout=log, stderr=subprocess.STDOUT, cwd=cwd, check=True
+        )
+
+
+def _venv_python(venv_path):
+    return f"{venv_path}/bin/python3"
+
+
+def _venv_site_packages(venv_path):
+    python_version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    return f"{venv_path}/lib/{python_version}/site-packages"
+
+
+def _hash_files(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _pip_install(venv_path, wheel_path, log_path, *requirements):
+    # Wheels are built into the shared cache first so identical dependencies are only ever built once
+    python = _venv_python(venv_path)
+
+    # Built into a private directory then renamed into the cache - concurrent setups may build the same wheel
+    build_path = tempfile.mkdtemp(prefix="wheels-", dir=os.path.dirname(wheel_path))
+    try:
+        _run_command(
+            [python, "-m", "pip", "wheel", "--wheel-dir", build_path, "--find-links", wheel_path]
+            + list(requirements),
+            log_path,
+        )
+        for file_name in os.listdir(build_path):
+            os.replace(f"{build_path}/{file_name}", f"{wheel_path}/{file_name}")
+    finally:
+        shutil.rmtree(build_path, ignore_errors=True)
+
+    _run_command(
+        [python, "-m", "pip", "install", "--find-links", wheel_path] + list(requirements),
+        log_path,
+    )
+
+
+def build_base_environment(work_path, cares_rl_path):
+    base_path = f"{work_path}/base"
+    wheel_path = f"{work_path}/wheels"
+    log_path = f"{work_path}/base.log"
+    os.makedirs(wheel_path, exist_ok=True)
+
+    requirement_files = [
+        f"{cares_rl_path}/requirements.txt",
+        f"{REPO_PATH}/requirements.txt",
+    ]
+    marker_path = f"{base_path}/.requirements_hash"
+    requirements_hash = _hash_files(requirement_files)
+
+    if os.path.exists(marker_path):
+        with open(marker_path, "r", encoding="utf-8") as file:
+            if file.read() == requirements_hash:
+                logging.info(f"Reusing cached base environment: {base_path}")
+                return base_path, wheel_path
+
+    logging.info(f"Building base environment: {base_path}")
+    shutil.rmtree(base_path, ignore_errors=True)
+    venv.create(base_path, with_pip=True)
+
+    _pip_install(base_path, wheel_path, log_path, "-r", requirement_files[0])
+    _pip_install(base_path, wheel_path, log_path, cares_rl_path)
+    _pip_install(base_path, wheel_path, log_path, "-r", requirement_files[1])
+
+    with open(marker_path, "w", encoding="utf-8") as file:
+        file.write(requirements_hash)
+
+    return base_path, wheel_path
+
+
+def find_submissions(submissions_path):
+    submissions = []
+    for upi in sorted(os.listdir(submissions_path)):
+        submission_path = f"{submissions_path}/{upi}"
+        if not os.path.isdir(submission_path):
+            continue
+
+        missing = [
+            file_name
+            for file_name in ["requirements.txt", "brock.py"]
+            if not os.path.isfile(f"{submission_path}/{file_name}")
+        ]
+        model_folders = sorted(
+            entry.path for entry in os.scandir(submission_path) if entry.is_dir()
+        )
+        if missing or len(model_folders) == 0:
+            logging.warning(f"Skipping {upi} - missing {missing or 'model folder'}")
+            continue
+
+        if len(model_folders) > 1:
+            logging.warning(
+                f"{upi} has {len(model_folders)} model folders - using {os.path.basename(model_folders[0])}"
+            )
+
+        submissions.append((upi, submission_path, model_folders[0]))
+    return submissions
+
+
+class SubmissionPipeline:
+    def __init__(self, work_path, base_path, wheel_path, setup_workers, eval_workers):
+        self.work_path = work_path
+        self.base_path = base_path
+        self.wheel_path = wheel_path
+
+        self.setup_pool = ThreadPoolExecutor(max_workers=setup_workers)
+        self.eval_pool = ThreadPoolExecutor(max_workers=eval_workers)
+
+        self.lock = threading.Lock()
+        self.reports = {}
+        self.eval_futures = []
+
+    def _record(self, upi, stage, duration=None, error=None):
+        with self.lock:
+            report = self.reports.setdefault(upi, {"upi": upi, "stages": {}})
+            if duration is not None:
+                report["stages"][stage] = duration
+            if error is not None:
+                report["status"] = "failed"
+                report["failed_stage"] = stage
+                report["error"] = str(error)
+
+    def _timed(self, upi, stage, function, *args):
+        start = time.time()
+        try:
+            return function(*args)
+        except Exception as error:
+            self._record(upi, stage, time.time() - start, error)
+            raise
+        finally:
+            self._record(upi, stage, time.time() - start)
+
+    def _copy_submission(self, upi, submission_path, model_folder):
+        results_path = f"{self.work_path}/results/{upi}"
+        source_path = f"{self.work_path}/src/{upi}"
+
+        # Each submission gets its own copy of this package so brock.py can be replaced concurrently
+        shutil.rmtree(source_path, ignore_errors=True)
+        shutil.copytree(
+            REPO_PATH,
+            source_path,
+            ignore=shutil.ignore_patterns(".git", "media", "results", "__pycache__"),
+        )
+        shutil.copy(
+            f"{submission_path}/brock.py",
+            f"{source_path}/pyboy_environment/environments/pokemon/tasks/brock.py",
+        )
+        shutil.copy(
+            f"{submission_path}/requirements.txt", f"{source_path}/requirements.txt"
+        )
+
+        model_path = f"{results_path}/models"
+        shutil.rmtree(model_path, ignore_errors=True)
+        shutil.copytree(model_folder, model_path)
+
+        model_files = sorted(os.listdir(model_path))
+        model_name = model_files[-1].split("_")[0]
+        return source_path, results_path, model_name
+
+    def _create_venv(self, upi):
+        venv_path = f"{self.work_path}/venv/{upi}"
+        shutil.rmtree(venv_path, ignore_errors=True)
+        venv.create(venv_path, with_pip=True)
+
+        # Layer the submission environment on top of the shared base
+        with open(
+            f"{_venv_site_packages(venv_path)}/base_environment.pth", "w", encoding="utf-8"
+        ) as file:
+            file.write(_venv_site_packages(self.base_path) + "\n")
+        return venv_path
+
+    def _install(self, venv_path, source_path, log_path):
+        _pip_install(
+            venv_path, self.wheel_path, log_path, "-r", f"{source_path}/requirements.txt"
+        )
+        _run_command(
+            [_venv_python(venv_path), "-m", "pip", "install", "--no-deps", source_path],
+            log_path,
+        )
+
+    def _evaluate(self, upi, venv_path, results_path, model_name, log_path):
+        _run_command(
+            [
+                _venv_python(venv_path),
+                "-m",
+                "pyboy_environment.evaluate",
+                "--upi",
+                upi,
+                "--model_path",
+                results_path,
+                "--model_name",
+                model_name,
+                "--results_path",
+                results_path,
+            ],
+            log_path,
+            cwd=results_path,
+        )
+
+    def _setup(self, upi, submission_path, model_folder):
+        log_path = f"{self.work_path}/logs/{upi}.log"
+        try:
+            source_path, results_path, model_name = self._timed(
+                upi, "copy", self._copy_submission, upi, submission_path, model_folder
+            )
+            venv_path = self._timed(upi, "venv", self._create_venv, upi)
+            self._timed(upi, "install", self._install, venv_path, source_path, log_path)
+        except Exception as error:
+            logging.error(f"Setup failed for {upi}: {error}")
+            return
+
+        logging.info(f"Setup complete for {upi} - queued for evaluation")
+        with self.lock:
+            self.eval_futures.append(
+                self.eval_pool.submit(
+                    self._run_evaluation, upi, venv_path, results_path, model_name, log_path
+                )
+            )
+
+    def _run_evaluation(self, upi, venv_path, results_path, model_name, log_path):
+        try:
+            self._timed(
+                upi, "evaluate", self._evaluate, upi, venv_path, results_path, model_name, log_path
+            )
+        except Exception as error:
+            logging.error(f"Evaluation failed for {upi}: {error}")
+            return
+
+        with self.lock:
+            self.reports[upi]["status"] = "complete"
+        logging.info(f"Evaluation complete for {upi}")
+
+    def run(self, submissions):
+        os.makedirs(f"{self.work_path}/logs", exist_ok=True)
+
+        setup_futures = [
+            self.setup_pool.submit(self._setup, upi, submission_path, model_folder)
+            for upi, submission_path, model_folder in submissions
+        ]
+        for future in setup_futures:
+            future.result()
+        self.setup_pool.shutdown()
+
+        # Evaluations are queued as soon as their setup finishes, so they overlap with the remaining setups
+        for future in list(self.eval_futures):
+            future.result()
+        self.eval_pool.shutdown()
+
+        return [self.reports[upi] for upi in sorted(self.reports)]
+
+
+def report_timings(reports, total_time):
+    stage_totals = {}
+    for report in reports:
+        stages = " ".join(
+            f"{stage}: {duration:.1f}s" for stage, duration in report["stages"].items()
+        )
+        logging.info(f"{report['upi']} - {report.get('status', 'incomplete')} - {stages}")
+        for stage, duration in report["stages"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + duration
+
+    for stage, duration in stage_totals.items():
+        logging.info(f"Total {stage}: {duration:.1f}s")
+    logging.info(f"Wall clock: {total_time:.1f}s")
+
+
+def main():
+    args = get_args()
+
+    start = time.time()
+
+    base_start = time.time()
+    base_path, wheel_path = build_base_environment(args.work_path, args.cares_rl_path)
+    base_time = time.time() - base_start
+
+    submissions = find_submissions(args.submissions_path)
+    logging.info(f"Found {len(submissions)} submissions")
+
+    pipeline = SubmissionPipeline(
+        args.work_path, base_path, wheel_path, args.setup_workers, args.eval_workers
+    )
+    reports = pipeline.run(submissions)
+
+    total_time = time.time() - start
+    logging.info(f"Base environment: {base_time:.1f}s")
+    report_timings(reports, total_time)
+
+    with open(f"{args.work_path}/pipeline_report.json", "w", encoding="utf-8") as file:
+        json.dump(
+            {"base_time": base_time, "total_time": total_time, "submissions": reports},
+            file,
+            indent=4,
+        )
+
+
+if __name__ == "__main__":
+    main()
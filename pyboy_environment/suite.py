@@ -1,4 +1,5 @@
 from pyboy_environment.environments import PyboyEnvironment
+from pyboy_environment.environments.macro_actions import MacroAction
 from pyboy_environment.environments.mario.mario_run import MarioRun
 from pyboy_environment.environments.pokemon.tasks.brock import PokemonBrock
 
@@ -9,16 +10,17 @@ def make(
     act_freq: int,
     emulation_speed: int = 0,
     headless: bool = False,
+    macro_actions: list[MacroAction] | None = None,
 ) -> PyboyEnvironment:
 
     if domain == "mario":
         if task == "run":
-            env = MarioRun(act_freq, emulation_speed, headless)
+            env = MarioRun(act_freq, emulation_speed, headless, macro_actions)
         else:
             raise ValueError(f"Unknown Mario task: {task}")
     elif domain == "pokemon":
         if task == "brock":
-            env = PokemonBrock(act_freq, emulation_speed, headless)
+            env = PokemonBrock(act_freq, emulation_speed, headless, macro_actions)
         else:
             raise ValueError(f"Unknown Pokemon task: {task}")
     else:
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from pyboy_environment.environments.pokemon.battle import (
+    BATTLE_FIELDS,
+    BATTLE_MON,
+    ENEMY_MON,
+    IN_BATTLE,
+    BattleDecoder,
+)
+
+
+class FakeMemory:
+    def __init__(self) -> None:
+        self.data = bytearray(0x10000)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(self.data[key])
+        return self.data[key]
+
+    def __setitem__(self, address, value):
+        self.data[address] = value
+
+
+def _fields(state: np.ndarray) -> dict[str, float]:
+    return dict(zip(BATTLE_FIELDS, state.tolist()))
+
+
+def test_outside_battle():
+    decoder = BattleDecoder()
+    memory = FakeMemory()
+
+    shared = decoder.decode(memory, copy=False)
+    assert not shared.flags.writeable
+    assert not shared.any()
+
+    copied = decoder.decode(memory)
+    assert copied.flags.writeable
+    assert copied.shape == (len(BATTLE_FIELDS),)
+    copied[0] = 1
+    assert not decoder.decode(memory, copy=False).any()
+
+
+def test_in_battle_layout():
+    decoder = BattleDecoder()
+    memory = FakeMemory()
+    memory[IN_BATTLE] = 2
+
+    # Enemy Pidgey, 300 HP of 301, level 12, PP with two PP Ups applied
+    memory[ENEMY_MON] = 0x24
+    memory[ENEMY_MON + 1] = 0x01
+    memory[ENEMY_MON + 2] = 0x2C
+    memory[ENEMY_MON + 8] = 0x10
+    memory[ENEMY_MON + 14] = 12
+    memory[ENEMY_MON + 15] = 0x01
+    memory[ENEMY_MON + 16] = 0x2D
+    memory[ENEMY_MON + 25] = 0x80 | 35
+
+    # Player Squirtle, 22 HP, level 9
+    memory[BATTLE_MON] = 0xB1
+    memory[BATTLE_MON + 2] = 22
+    memory[BATTLE_MON + 14] = 9
+    memory[BATTLE_MON + 21] = 0x00
+    memory[BATTLE_MON + 22] = 19
+
+    fields = _fields(decoder.decode(memory))
+
+    assert fields["battle_type"] == 2
+    assert fields["enemy_species"] == 0x24
+    assert fields["enemy_hp"] == 300
+    assert fields["enemy_max_hp"] == 301
+    assert fields["enemy_move1"] == 0x10
+    assert fields["enemy_level"] == 12
+    assert fields["enemy_pp1"] == 35
+    assert fields["player_species"] == 0xB1
+    assert fields["player_hp"] == 22
+    assert fields["player_level"] == 9
+    assert fields["player_speed"] == 19
+    assert fields["player_attack"] == 0
+
+
+def test_lost_battle_and_buffers():
+    decoder = BattleDecoder()
+    memory = FakeMemory()
+    memory[IN_BATTLE] = 0xFF
+
+    shared = decoder.decode(memory, copy=False)
+    assert shared[0] == -1
+
+    copied = decoder.decode(memory)
+    assert copied is not shared
+    np.testing.assert_array_equal(copied, shared)
+
+    memory[IN_BATTLE] = 1
+    assert decoder.decode(memory, copy=False)[0] == 1
+    assert copied[0] == pytest.approx(-1)
@@ -0,0 +1,55 @@
+import json
+from functools import cmp_to_key
+
+import numpy as np
+
+from pyboy_environment.compare_results import (
+    compare_performance,
+    load_summaries,
+    rank_results,
+    summarise_result,
+)
+
+
+def _random_results(count: int, seed: int = 0) -> dict[str, dict]:
+    # Small ranges so every tier has ties to break
+    rng = np.random.default_rng(seed)
+    results = {}
+    for i in range(count):
+        party_size = int(rng.integers(1, 4))
+        results[f"upi{i:03d}"] = {
+            "badges": int(rng.integers(0, 2)),
+            "actions": int(rng.integers(0, 3)),
+            "caught_pokemon": int(rng.integers(0, 2)),
+            "seen_pokemon": int(rng.integers(0, 2)),
+            "levels": rng.integers(1, 4, size=party_size).tolist(),
+            "xp": rng.integers(0, 3, size=party_size).tolist(),
+        }
+    return results
+
+
+def test_rank_results_agrees_with_compare_performance():
+    for seed in range(5):
+        results = _random_results(200, seed)
+
+        expected = sorted(results, key=lambda upi: cmp_to_key(compare_performance)(results[upi]))
+        summaries = {upi: summarise_result(result) for upi, result in results.items()}
+        ranked = rank_results(summaries)
+
+        assert list(ranked["upi"]) == expected
+
+
+def test_load_summaries_uses_the_index(tmp_path):
+    for upi, result in _random_results(3).items():
+        (tmp_path / upi).mkdir()
+        (tmp_path / upi / "results.json").write_text(json.dumps(result))
+
+    summaries = load_summaries(str(tmp_path))
+    assert sorted(summaries) == ["upi000", "upi001", "upi002"]
+
+    # A changed results file is re-read, the others come from the index
+    changed = dict(_random_results(1, seed=9)["upi000"], badges=5)
+    (tmp_path / "upi001" / "results.json").write_text(json.dumps(changed))
+
+    assert load_summaries(str(tmp_path))["upi001"]["badges"] == 5
+    assert load_summaries(str(tmp_path)) == {**summaries, "upi001": summarise_result(changed)}
@@ -0,0 +1,60 @@
+import pytest
+
+from pyboy_environment.environments.count_min_sketch import CountMinSketch
+
+
+def test_counts_never_underestimate():
+    sketch = CountMinSketch(width=64, depth=4)
+    for key in range(200):
+        for _ in range(key % 5 + 1):
+            sketch.update((key, 1))
+
+    for key in range(200):
+        assert sketch.query((key, 1)) >= key % 5 + 1
+
+
+def test_exact_when_sparse():
+    sketch = CountMinSketch()
+    assert sketch.update((3, 4, 5)) == 1
+    assert sketch.update((3, 4, 5)) == 2
+    assert sketch.query((3, 4, 5)) == 2
+    assert sketch.query((5, 4, 3)) == 0
+
+
+def test_decay():
+    sketch = CountMinSketch(decay=0.5, decay_interval=2)
+    sketch.update((1,))
+    assert sketch.update((1,)) == 1
+
+
+def test_merge():
+    first = CountMinSketch(seed=7)
+    second = CountMinSketch(seed=7)
+    first.update((1, 2))
+    second.update((1, 2), 2)
+
+    first.merge(second)
+
+    assert first.query((1, 2)) == 3
+    assert first.updates == 2
+
+    with pytest.raises(ValueError):
+        first.merge(CountMinSketch(seed=8))
+
+
+def test_save_load(tmp_path):
+    sketch = CountMinSketch(width=256, depth=2, decay=0.9, decay_interval=10, seed=3)
+    sketch.update((9, 9), 4)
+
+    file_path = f"{tmp_path}/sketch.npz"
+    sketch.save(file_path)
+    loaded = CountMinSketch.load(file_path)
+
+    assert loaded.query((9, 9)) == 4
+    assert (loaded.width, loaded.depth, loaded.seed, loaded.updates) == (256, 2, 3, 1)
+    assert loaded.decay == pytest.approx(0.9)
+
+
+def test_width_must_be_power_of_two():
+    with pytest.raises(ValueError):
+        CountMinSketch(width=100)
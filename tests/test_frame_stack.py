@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from pyboy_environment.environments.frame_stack import FrameStack
+
+
+def test_first_stack_is_zero_padded():
+    stack = FrameStack(3)
+    stack.push(np.full(2, 5, dtype=np.uint8))
+
+    np.testing.assert_array_equal(stack.view(), [[0, 0], [0, 0], [5, 5]])
+
+
+def test_stack_survives_roll_over():
+    stack = FrameStack(3, capacity_multiple=2)
+    for value in range(20):
+        stack.push(np.full(2, value))
+
+        expected = [[max(v, 0)] * 2 for v in range(value - 2, value + 1)]
+        np.testing.assert_array_equal(stack.view(), expected)
+
+
+def test_clear_starts_a_new_episode():
+    stack = FrameStack(2)
+    stack.push(np.ones(3))
+    stack.push(np.ones(3))
+
+    stack.clear()
+    stack.push(np.full(3, 2.0))
+
+    np.testing.assert_array_equal(stack.view(), [[0, 0, 0], [2, 2, 2]])
+
+
+def test_view_is_read_only():
+    stack = FrameStack(2)
+    stack.push(np.ones(3))
+
+    with pytest.raises(ValueError):
+        stack.view()[0, 0] = 1
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        FrameStack(0)
+
+    stack = FrameStack(2)
+    with pytest.raises(ValueError):
+        stack.view()
+
+    stack.push(np.ones(3))
+    with pytest.raises(ValueError):
+        stack.push(np.ones(4))
@@ -0,0 +1,67 @@
+import pytest
+from pyboy.utils import WindowEvent
+
+from pyboy_environment.environments.macro_actions import (
+    ButtonSchedule,
+    mash_button,
+    press_and_release,
+    run_jump,
+    walk_tiles,
+)
+
+
+def test_schedule_orders_events():
+    schedule = ButtonSchedule(
+        10, [(5, WindowEvent.RELEASE_BUTTON_A), (0, WindowEvent.PRESS_BUTTON_A)]
+    )
+
+    assert schedule.events == [(0, WindowEvent.PRESS_BUTTON_A), (5, WindowEvent.RELEASE_BUTTON_A)]
+
+
+def test_schedule_rejects_late_events():
+    with pytest.raises(ValueError):
+        ButtonSchedule(4, [(5, WindowEvent.PRESS_BUTTON_A)])
+
+
+def test_press_and_release():
+    schedule = press_and_release(WindowEvent.PRESS_BUTTON_B, WindowEvent.RELEASE_BUTTON_B, 3, 8)
+
+    assert schedule.frames == 8
+    assert schedule.events == [(0, WindowEvent.PRESS_BUTTON_B), (3, WindowEvent.RELEASE_BUTTON_B)]
+
+
+def test_walk_tiles_has_a_segment_per_tile():
+    macro = walk_tiles("up_3", WindowEvent.PRESS_ARROW_UP, WindowEvent.RELEASE_ARROW_UP, 3)
+
+    assert len(macro.segments) == 3
+    assert macro.frames == 48
+    assert macro.segments[0].events[1] == (8, WindowEvent.RELEASE_ARROW_UP)
+    assert repr(macro) == "MacroAction(up_3, segments=3, frames=48)"
+
+
+def test_mash_button():
+    macro = mash_button("mash_a", WindowEvent.PRESS_BUTTON_A, WindowEvent.RELEASE_BUTTON_A, 5, interval=6)
+
+    assert len(macro.segments) == 5
+    assert macro.frames == 30
+
+
+def test_run_jump_releases_both_buttons_at_the_end():
+    macro = run_jump(
+        "run_jump",
+        WindowEvent.PRESS_BUTTON_B,
+        WindowEvent.RELEASE_BUTTON_B,
+        WindowEvent.PRESS_BUTTON_A,
+        WindowEvent.RELEASE_BUTTON_A,
+        run_up_frames=10,
+        jump_frames=20,
+    )
+
+    (schedule,) = macro.segments
+    assert schedule.frames == 30
+    assert schedule.events == [
+        (0, WindowEvent.PRESS_BUTTON_B),
+        (10, WindowEvent.PRESS_BUTTON_A),
+        (30, WindowEvent.RELEASE_BUTTON_A),
+        (30, WindowEvent.RELEASE_BUTTON_B),
+    ]
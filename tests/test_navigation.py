@@ -0,0 +1,81 @@
+import numpy as np
+
+from pyboy_environment.environments.pokemon.navigation import (
+    NavigationCache,
+    UNREACHABLE,
+    distance_field,
+)
+
+WALKABLE = np.array(
+    [
+        [1, 1, 1, 1],
+        [0, 0, 1, 0],
+        [1, 1, 1, 0],
+        [1, 0, 0, 0],
+    ],
+    dtype=bool,
+)
+
+SIGNATURE = (4, 4, 0, 0, 0, "0123456789abcdef")
+
+
+def test_distance_field():
+    field = distance_field(WALKABLE, [(0, 0)])
+
+    assert field[0, 0] == 0
+    assert field[0, 3] == 3
+    assert field[2, 0] == 6
+    assert field[3, 0] == 7
+    assert field[1, 0] == UNREACHABLE
+    assert field[3, 3] == UNREACHABLE
+
+
+def test_nearest_of_several_targets():
+    field = distance_field(WALKABLE, [(0, 0), (0, 3)])
+
+    assert field[2, 0] == 1
+    assert field[0, 3] == 3
+
+
+def test_signature_mismatch_rebuilds():
+    cache = NavigationCache()
+    assert not cache.has_grid(1, SIGNATURE)
+
+    cache.set_grid(1, SIGNATURE, WALKABLE)
+    assert cache.has_grid(1, SIGNATURE)
+    assert cache.distance(1, [(0, 0)], 3, 0) == 3
+    assert cache.distance(1, [(0, 0)], 9, 9) == UNREACHABLE
+
+    # Same map_id with different block data - mid-warp or after an event changes the map
+    changed = SIGNATURE[:-1] + ("fedcba9876543210",)
+    assert not cache.has_grid(1, changed)
+
+    open_grid = np.ones_like(WALKABLE)
+    cache.set_grid(1, changed, open_grid)
+    assert cache.fields == {}
+    assert cache.distance(1, [(0, 0)], 3, 3) == 6
+
+
+def test_nothing_written_until_saved(tmp_path):
+    cache_path = f"{tmp_path}/navigation.npz"
+    cache = NavigationCache(cache_path)
+    cache.set_grid(1, SIGNATURE, WALKABLE)
+    cache.distance(1, [(0, 0)], 3, 0)
+
+    assert not (tmp_path / "navigation.npz").exists()
+
+    cache.save()
+    loaded = NavigationCache(cache_path)
+
+    assert loaded.has_grid(1, SIGNATURE)
+    assert len(loaded.fields) == 1
+    assert loaded.distance(1, [(0, 0)], 3, 0) == 3
+
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    cache_path = tmp_path / "navigation.npz"
+    cache_path.write_bytes(b"not a cache")
+
+    cache = NavigationCache(str(cache_path))
+
+    assert cache.grids == {}
@@ -0,0 +1,66 @@
+from pyboy_environment.environments.pokemon.pokemon_stats import PokemonStatsSnapshot
+
+
+def _stats(**overrides) -> dict:
+    stats = {
+        "location": {"x": 5, "y": 6, "map_id": 0},
+        "party_size": 1,
+        "badges": 0,
+        "caught_pokemon": 1,
+        "seen_pokemon": 1,
+        "money": 3000,
+        "xp": [135],
+        "levels": [5],
+        "hp": {"current": [20], "max": [20]},
+        "events": [0, 0],
+    }
+    stats.update(overrides)
+    return stats
+
+
+def test_unchanged_stats():
+    snapshot = PokemonStatsSnapshot()
+    first = _stats()
+    snapshot.load(first)
+
+    second = _stats()
+    delta = snapshot.advance(second)
+
+    assert delta.changed == ()
+    assert delta.xp == 0
+    assert snapshot.source is second
+
+
+def test_deltas():
+    snapshot = PokemonStatsSnapshot()
+    snapshot.load(_stats())
+
+    delta = snapshot.advance(
+        _stats(
+            location={"x": 5, "y": 7, "map_id": 0},
+            money=2500,
+            xp=[150, 20],
+            levels=[6, 3],
+            hp={"current": [18, 15], "max": [20, 15]},
+            party_size=2,
+        )
+    )
+
+    assert delta.money == -500
+    assert delta.xp == 35
+    assert delta.levels == 4
+    assert delta.hp == 13
+    assert delta.party_size == 1
+    assert delta.location
+    assert set(delta.changed) == {"money", "xp", "levels", "hp", "party_size", "location"}
+
+    # The buffers now hold the second step
+    third = _stats(
+        location={"x": 5, "y": 7, "map_id": 0},
+        money=2500,
+        xp=[150, 21],
+        levels=[6, 3],
+        hp={"current": [18, 15], "max": [20, 15]},
+        party_size=2,
+    )
+    assert snapshot.advance(third).changed == ("xp",)
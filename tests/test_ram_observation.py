@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from pyboy_environment.environments.ram_observation import (
+    HRAM_SIZE,
+    WRAM_SIZE,
+    RamObservation,
+)
+
+
+class FakeMemory:
+    def __init__(self) -> None:
+        self.data = bytearray(0x10000)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(self.data[key])
+        return self.data[key]
+
+    def __setitem__(self, address, value):
+        self.data[address] = value
+
+
+def test_reads_wram_and_hram():
+    memory = FakeMemory()
+    memory[0xC000] = 1
+    memory[0xDFFF] = 2
+    memory[0xFF80] = 3
+    memory[0xFFFE] = 4
+
+    observation = RamObservation(include_hram=True)
+    state = observation.read(memory)
+
+    assert observation.size == WRAM_SIZE + HRAM_SIZE
+    assert state[[0, WRAM_SIZE - 1, WRAM_SIZE, WRAM_SIZE + HRAM_SIZE - 1]].tolist() == [1, 2, 3, 4]
+    assert observation.addresses()[WRAM_SIZE] == 0xFF80
+
+
+def test_address_mask():
+    memory = FakeMemory()
+    memory[0xD057] = 7
+    memory[0xD35E] = 9
+    memory[0xFFD7] = 11
+
+    observation = RamObservation(include_hram=True, address_mask=[0xD35E, 0xFFD7, 0xD057])
+
+    assert observation.read(memory).tolist() == [9, 11, 7]
+    assert observation.addresses().tolist() == [0xD35E, 0xFFD7, 0xD057]
+
+    mask = np.zeros(WRAM_SIZE, dtype=bool)
+    mask[0xD057 - 0xC000] = True
+    assert RamObservation(address_mask=mask).read(memory).tolist() == [7]
+
+
+def test_mask_errors():
+    with pytest.raises(ValueError):
+        RamObservation(address_mask=[0xFFD7])
+    with pytest.raises(ValueError):
+        RamObservation(address_mask=[0x8000])
+    with pytest.raises(ValueError):
+        RamObservation(address_mask=np.zeros(10, dtype=bool))
+
+
+def test_copy_and_view():
+    memory = FakeMemory()
+    observation = RamObservation()
+
+    copied = observation.read(memory)
+    view = observation.read(memory, copy=False)
+    assert not view.flags.writeable
+
+    memory[0xC010] = 5
+    observation.read(memory, copy=False)
+
+    assert view[0x10] == 5
+    assert copied[0x10] == 0
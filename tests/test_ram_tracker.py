@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from pyboy_environment.environments.ram_tracker import RamTracker
+
+
+class FakeMemory:
+    def __init__(self) -> None:
+        self.data = bytearray(0x10000)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(self.data[key])
+        return self.data[key]
+
+    def __setitem__(self, address, value):
+        self.data[address] = value
+
+
+def _run(tracker, memory, steps):
+    # 0xD35E and 0xD36A change together every third step, 0xC000 every step, 0xD057 on rewarded steps
+    tracker.clear(memory)
+    for step in range(steps):
+        memory[0xC000] = step % 256
+        if step % 3 == 0:
+            memory[0xD35E] = (memory[0xD35E] + 1) % 256
+            memory[0xD36A] = (memory[0xD36A] + 2) % 256
+        reward = 1.0 if step % 5 == 0 else 0.0
+        if reward:
+            memory[0xD057] ^= 0x01
+        tracker.record(memory, reward)
+
+
+def test_change_queries():
+    tracker = RamTracker(capacity=64)
+    memory = FakeMemory()
+    _run(tracker, memory, 30)
+
+    frequency = tracker.change_frequency()
+    assert frequency[0xD35E - 0xC000] == pytest.approx(10 / 30)
+    assert set(tracker.changed_addresses()) == {0xC000, 0xD35E, 0xD36A, 0xD057}
+    assert tracker.changed_mask()[0xD057 - 0xC000] == 0x01
+    assert tracker.changed_with(0xD35E).tolist() == [0xD36A]
+    assert tracker.changed_with(0xD100).size == 0
+
+
+def test_reward_correlation():
+    tracker = RamTracker(capacity=64)
+    memory = FakeMemory()
+    _run(tracker, memory, 30)
+
+    addresses, correlation = tracker.correlated_with_reward(top=1)
+
+    assert addresses.tolist() == [0xD057]
+    assert correlation[0] == pytest.approx(1.0)
+
+
+def test_ring_buffer_keeps_the_latest_steps():
+    tracker = RamTracker(capacity=8)
+    memory = FakeMemory()
+    _run(tracker, memory, 20)
+
+    assert tracker.length == 8
+    np.testing.assert_array_equal(tracker.values(0xC000), np.arange(12, 20))
+
+    with pytest.raises(ValueError):
+        tracker.values(0xFF80)
+
+    tracker.clear(memory)
+    assert tracker.change_frequency().sum() == 0
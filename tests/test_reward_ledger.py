@@ -0,0 +1,33 @@
+import pytest
+
+from pyboy_environment.environments.reward_ledger import RewardLedger
+
+
+def test_record_and_summary():
+    ledger = RewardLedger(capacity=2)
+
+    assert ledger.record({"xp": 1.0, "badges": 0.0}) == 1.0
+    assert ledger.record({"xp": 2.0}) == 2.0
+    # New components and growth past the initial capacity
+    assert ledger.record({"xp": 0.0, "novelty": 0.5}) == 0.5
+
+    assert ledger.components == ["xp", "badges", "novelty"]
+    assert ledger.episode_rewards().shape == (3, 3)
+
+    summary = ledger.summary()
+    assert summary["xp"]["total"] == 3.0
+    assert summary["xp"]["max"] == 2.0
+    assert summary["xp"]["non_zero_steps"] == 2
+    assert summary["novelty"]["mean"] == pytest.approx(0.5 / 3)
+    assert summary["badges"]["non_zero_steps"] == 0
+
+
+def test_reset():
+    ledger = RewardLedger()
+    ledger.record({"xp": 1.0})
+
+    ledger.reset()
+
+    assert ledger.summary() == {}
+    ledger.record({"xp": 4.0})
+    assert ledger.summary()["xp"]["total"] == 4.0
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from pyboy_environment.environments.savestate_store import SavestateStore
+
+
+def _state(seed: int, size: int = 4096 * 8) -> bytes:
+    # Mostly shared pages with one page that differs per seed
+    shared = bytes(range(256)) * (size // 256)
+    page = bytes([seed % 256]) * 4096
+    return shared[:4096] + page + shared[8192:]
+
+
+def test_put_get_round_trip(tmp_path):
+    store = SavestateStore(str(tmp_path), chunk_size=4096)
+    state = _state(1)
+
+    store.put("start", state)
+
+    assert "start" in store
+    assert store.names() == ["start"]
+    assert store.get("start") == state
+
+
+def test_shared_chunks_are_stored_once(tmp_path):
+    store = SavestateStore(str(tmp_path), chunk_size=4096)
+
+    first_new = store.put("a", _state(1))
+    second_new = store.put("b", _state(2))
+
+    assert second_new == 1
+    usage = store.disk_usage()
+    assert usage["unique_chunks"] == first_new + second_new
+    assert usage["chunk_references"] == 16
+    assert usage["dedup_ratio"] > 1
+
+
+def test_same_content_under_two_codecs(tmp_path):
+    state = _state(1)
+
+    zlib_store = SavestateStore(str(tmp_path), chunk_size=4096, codec="zlib")
+    zlib_store.put("zlib", state)
+
+    # A fresh store so no decompressed chunk is cached - the lzma manifest must find lzma chunks on disk
+    lzma_store = SavestateStore(str(tmp_path), chunk_size=4096, codec="lzma")
+    assert lzma_store.put("lzma", state) > 0
+
+    fresh_store = SavestateStore(str(tmp_path), chunk_size=4096)
+    assert fresh_store.get("lzma") == state
+    assert fresh_store.get("zlib") == state
+
+
+def test_collect_garbage_keeps_referenced_chunks(tmp_path):
+    store = SavestateStore(str(tmp_path), chunk_size=4096)
+    store.put("a", _state(1))
+    store.put("b", _state(2))
+
+    store.delete("b")
+    assert store.collect_garbage() == 1
+    assert store.collect_garbage() == 0
+
+    fresh_store = SavestateStore(str(tmp_path), chunk_size=4096)
+    assert fresh_store.get("a") == _state(1)
+
+
+def test_collect_garbage_is_per_codec(tmp_path):
+    state = _state(1)
+    SavestateStore(str(tmp_path), chunk_size=4096, codec="zlib").put("zlib", state)
+    store = SavestateStore(str(tmp_path), chunk_size=4096, codec="bz2")
+    store.put("bz2", state)
+
+    store.delete("zlib")
+    assert store.collect_garbage() == store.disk_usage()["unique_chunks"]
+    assert SavestateStore(str(tmp_path), chunk_size=4096).get("bz2") == state
+
+
+def test_missing_chunk_is_reported(tmp_path):
+    store = SavestateStore(str(tmp_path), chunk_size=4096)
+    store.put("a", _state(1))
+
+    chunk_directory = tmp_path / "chunks" / "zlib"
+    for directory in chunk_directory.iterdir():
+        for chunk in directory.iterdir():
+            os.remove(chunk)
+            break
+        break
+
+    with pytest.raises(FileNotFoundError):
+        SavestateStore(str(tmp_path), chunk_size=4096).get("a")
+
+
+def test_unknown_codec(tmp_path):
+    with pytest.raises(ValueError):
+        SavestateStore(str(tmp_path), codec="gzip")
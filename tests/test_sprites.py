@@ -0,0 +1,88 @@
+import numpy as np
+
+from pyboy_environment.environments.pokemon.sprites import (
+    FACING_LEFT,
+    OFF_SCREEN,
+    SPRITE_COUNT,
+    decode_sprites,
+    sprite_layer,
+    visible_sprites,
+)
+
+
+class FakeMemory:
+    def __init__(self) -> None:
+        self.data = bytearray(0x10000)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(self.data[key])
+        return self.data[key]
+
+    def __setitem__(self, address, value):
+        self.data[address] = value
+
+
+def _set_sprite(memory, index, picture_id, y_pixels, x_pixels, image_index=0, map_y=0, map_x=0):
+    data1 = 0xC100 + index * 16
+    data2 = 0xC200 + index * 16
+    memory[data1] = picture_id
+    memory[data1 + 2] = image_index
+    memory[data1 + 4] = y_pixels
+    memory[data1 + 6] = x_pixels
+    memory[data2 + 4] = map_y
+    memory[data2 + 5] = map_x
+
+
+def test_decode_interleaves_both_tables():
+    memory = FakeMemory()
+    _set_sprite(memory, 3, picture_id=0x05, y_pixels=0x2C, x_pixels=0x30, map_y=9, map_x=11)
+    memory[0xC100 + 3 * 16 + 3] = 0xFF  # y_step of -1
+    memory[0xC100 + 3 * 16 + 9] = FACING_LEFT
+    memory[0xC200 + 3 * 16 + 14] = 0x40
+
+    sprites = decode_sprites(memory)
+
+    assert sprites.shape == (SPRITE_COUNT,)
+    sprite = sprites[3]
+    assert sprite["picture_id"] == 0x05
+    assert sprite["y_pixels"] == 0x2C
+    assert sprite["x_pixels"] == 0x30
+    assert sprite["y_step"] == -1
+    assert sprite["facing"] == FACING_LEFT
+    assert (sprite["map_y"], sprite["map_x"]) == (9, 11)
+    assert sprite["image_base"] == 0x40
+    assert sprites["picture_id"][np.arange(SPRITE_COUNT) != 3].sum() == 0
+
+
+def test_visible_sprites():
+    memory = FakeMemory()
+    _set_sprite(memory, 0, picture_id=0x01, y_pixels=0x3C, x_pixels=0x40)
+    _set_sprite(memory, 1, picture_id=0x02, y_pixels=0, x_pixels=0, image_index=OFF_SCREEN)
+    _set_sprite(memory, 2, picture_id=0x03, y_pixels=0, x_pixels=0)
+
+    visible = visible_sprites(decode_sprites(memory))
+
+    assert visible.tolist()[:4] == [True, False, True, False]
+
+
+def test_layer_is_aligned_with_the_collision_grid():
+    memory = FakeMemory()
+    # The player is always drawn at pixel (64, 60) - the 2x2 tiles at rows 8-9, columns 8-9 of the 18x20 grid
+    _set_sprite(memory, 0, picture_id=0x01, y_pixels=0x3C, x_pixels=0x40)
+    # An NPC one step up and two steps right of the player
+    _set_sprite(memory, 1, picture_id=0x07, y_pixels=0x3C - 16, x_pixels=0x40 + 32)
+    # Partly off the right edge of the screen
+    _set_sprite(memory, 2, picture_id=0x09, y_pixels=0x3C, x_pixels=152)
+
+    sprites = decode_sprites(memory)
+    layer = sprite_layer(sprites)
+
+    assert layer.shape == (18, 20)
+    assert not layer[8:10, 8:10].any()
+    assert (layer[6:8, 12:14] == 0x07).all()
+    assert (layer[8:10, 19] == 0x09).all()
+    assert np.count_nonzero(layer) == 6
+
+    with_player = sprite_layer(sprites, include_player=True)
+    assert (with_player[8:10, 8:10] == 0x01).all()
@@ -0,0 +1,55 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from pyboy_environment.environments.telemetry import QuantileSketch
+
+
+def test_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(size=5000)
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(float(value))
+
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    assert sketch.count == 5000
+    assert sketch.summary()["mean"] == pytest.approx(values.mean())
+
+
+def test_negative_and_zero_values():
+    sketch = QuantileSketch()
+    for value in (-4.0, -1.0, 0.0, 0.0, 2.0):
+        sketch.add(value)
+
+    assert sketch.quantile(0.0) == pytest.approx(-4.0, rel=0.01)
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1.0) == pytest.approx(2.0, rel=0.01)
+
+
+def test_merge_and_round_trip():
+    first = QuantileSketch()
+    second = QuantileSketch()
+    for value in range(1, 101):
+        (first if value % 2 else second).add(float(value))
+
+    first.merge(second)
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(first.to_dict())))
+
+    assert restored.count == 100
+    assert restored.quantile(0.5) == pytest.approx(50, rel=0.02)
+    assert (restored.min, restored.max) == (1.0, 100.0)
+
+    with pytest.raises(ValueError):
+        first.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch()
+
+    assert math.isnan(sketch.quantile(0.5))
+    assert QuantileSketch.from_dict(sketch.to_dict()).count == 0
@@ -0,0 +1,58 @@
+from pyboy_environment.environments.pokemon.warp_graph import UNREACHABLE, WarpGraph
+
+
+def _graph(cache_path=None) -> WarpGraph:
+    graph = WarpGraph(cache_path)
+    # 0 -> 1 -> 2 and a direct way back from 2 to 0
+    graph.record((0, 5, 5), (1, 2, 7))
+    graph.record((1, 3, 0), (2, 3, 9))
+    graph.record((2, 4, 4), (0, 5, 6))
+    return graph
+
+
+def test_record():
+    graph = _graph()
+
+    assert len(graph) == 3
+    # Same map and repeated edges are ignored
+    assert not graph.record((0, 1, 1), (0, 1, 2))
+    assert not graph.record((0, 5, 5), (1, 2, 7))
+
+
+def test_routes():
+    graph = _graph()
+
+    assert graph.map_distance(0, 0) == 0
+    assert graph.map_distance(0, 2) == 2
+    assert graph.map_distance(2, 1) == 2
+    assert graph.map_distance(0, 3) == UNREACHABLE
+
+    assert graph.route(0, 2) == [(0, 5, 5, 1, 2, 7), (1, 3, 0, 2, 3, 9)]
+    assert graph.exit_towards(0, 2) == (5, 5)
+    assert graph.exit_towards(0, 3) is None
+
+
+def test_new_edge_invalidates_routes():
+    graph = _graph()
+    assert graph.map_distance(0, 2) == 2
+
+    graph.record((0, 9, 9), (2, 0, 0))
+
+    assert graph.map_distance(0, 2) == 1
+
+
+def test_nothing_written_until_saved(tmp_path):
+    cache_path = f"{tmp_path}/warps.npz"
+    graph = _graph(cache_path)
+
+    assert graph.dirty
+    assert not (tmp_path / "warps.npz").exists()
+
+    graph.save()
+    assert not graph.dirty
+
+    loaded = WarpGraph(cache_path)
+
+    assert len(loaded) == 3
+    assert not loaded.dirty
+    assert loaded.map_distance(0, 2) == 2
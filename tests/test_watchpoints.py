@@ -0,0 +1,91 @@
+import pytest
+
+from pyboy_environment.environments.watchpoints import WatchpointSet
+
+
+class FakeMemory:
+    def __init__(self) -> None:
+        self.data = bytearray(0x10000)
+
+    def __getitem__(self, key):
+        return list(self.data[key])
+
+    def __setitem__(self, address, value):
+        self.data[address] = value
+
+
+def test_conditions():
+    memory = FakeMemory()
+    watchpoints = WatchpointSet()
+    watchpoints.register("changed", 0xD057)
+    watchpoints.register("equals", 0xD35E, "equals", 54)
+    watchpoints.register("below", 0xD16C, "below", 10)
+    watchpoints.register("mask", 0xD356, "mask", 0x01)
+    watchpoints.register("pair", [0xC100, 0xC200], "equals", 0x0107)
+    memory[0xD16C] = 50
+
+    watchpoints.arm(memory)
+    assert watchpoints.check(memory) == []
+
+    memory[0xD057] = 1
+    memory[0xD35E] = 54
+    memory[0xD16C] = 3
+    memory[0xD356] = 0x81
+    memory[0xC200] = 7
+    assert watchpoints.check(memory) == ["changed", "equals", "below", "mask"]
+
+    memory[0xC100] = 1
+    assert "pair" in watchpoints.check(memory)
+
+
+def test_multi_byte_values_are_big_endian():
+    memory = FakeMemory()
+    watchpoints = WatchpointSet()
+    watchpoints.register("changed", [0xD16C, 0xD16D])
+    watchpoints.register("below", [0xD16C, 0xD16D], "below", 0x0110)
+    memory[0xD16C] = 0x01
+    memory[0xD16D] = 0x20
+
+    watchpoints.arm(memory)
+
+    # Only the low byte changes - still a change of the whole value
+    memory[0xD16D] = 0x21
+    assert watchpoints.check(memory) == ["changed"]
+
+    memory[0xD16D] = 0x0F
+    assert watchpoints.check(memory) == ["changed", "below"]
+
+
+def test_edge_triggered():
+    memory = FakeMemory()
+    watchpoints = WatchpointSet()
+    watchpoints.register("equals", 0xD35E, "equals", 54)
+
+    memory[0xD35E] = 54
+    watchpoints.arm(memory)
+
+    # Already true when armed - does not fire again
+    assert watchpoints.check(memory) == []
+
+
+def test_clear_and_errors():
+    memory = FakeMemory()
+    watchpoints = WatchpointSet()
+    watchpoints.register("changed", 0xD057)
+    watchpoints.clear()
+
+    assert len(watchpoints) == 0
+    watchpoints.arm(memory)
+    assert watchpoints.check(memory) == []
+
+    with pytest.raises(ValueError):
+        watchpoints.register("bad", 0xD057, "above")
+    with pytest.raises(ValueError):
+        watchpoints.register("empty", [])
+    with pytest.raises(ValueError):
+        watchpoints.register("too_big", 0xD057, "equals", 256)
+    with pytest.raises(ValueError):
+        watchpoints.register("negative", [0xD16C, 0xD16D], "equals", -1)
+
+    watchpoints.register("word", [0xD16C, 0xD16D], "equals", 0xFFFF)
+    assert len(watchpoints) == 1
@@ -0,0 +1,71 @@
+import numpy as np
+
+from pyboy_environment.environments.pokemon.world_map import (
+    GRASS,
+    UNSEEN,
+    WALKABLE,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+    WorldMap,
+)
+
+
+class Reader:
+    # Window cells of a fixed world, recording which cells were read
+    def __init__(self, world: np.ndarray) -> None:
+        self.world = world
+        self.location = (0, 0)
+        self.reads = 0
+
+    def __call__(self, rows, columns):
+        self.reads += len(rows) * len(columns)
+        x, y = self.location
+        return self.world[np.ix_(rows + y - 4, columns + x - 4)]
+
+
+def test_full_window_then_scrolled_edge():
+    world = np.full((30, 30), WALKABLE, dtype=np.uint8)
+    world[10, 12] = GRASS
+    reader = Reader(world)
+    world_map = WorldMap(crop_height=4, crop_width=4, scale=1)
+
+    reader.location = (10, 10)
+    world_map.update(1, 10, 10, world.shape, reader)
+    assert reader.reads == WINDOW_HEIGHT * WINDOW_WIDTH
+
+    reader.reads = 0
+    reader.location = (11, 10)
+    world_map.update(1, 11, 10, world.shape, reader)
+    assert reader.reads == WINDOW_HEIGHT
+
+    canvas = world_map.canvases[1]
+    assert canvas[10, 12] == GRASS
+    np.testing.assert_array_equal(canvas[6:15, 6:16], world[6:15, 6:16])
+    assert canvas[0, 0] == UNSEEN
+
+
+def test_window_is_clipped_to_the_map():
+    world_map = WorldMap()
+
+    def read_cells(rows, columns):
+        return np.full((len(rows), len(columns)), WALKABLE, dtype=np.uint8)
+
+    world_map.update(1, 0, 0, (6, 6), read_cells)
+
+    assert (world_map.canvases[1][:5, :6] == WALKABLE).all()
+    assert (world_map.canvases[1][5:] == UNSEEN).all()
+
+
+def test_minimap_pools_and_clears():
+    world_map = WorldMap(crop_height=2, crop_width=2, scale=2)
+    canvas = np.zeros((4, 4), dtype=np.uint8)
+    canvas[0, 0] = GRASS
+    canvas[3, 3] = WALKABLE
+    world_map.canvases[1] = canvas
+
+    np.testing.assert_array_equal(world_map.minimap(1, 2, 2), [[GRASS, UNSEEN], [UNSEEN, WALKABLE]])
+    assert not world_map.minimap(2, 2, 2).any()
+
+    world_map.clear()
+    assert world_map.canvases == {}
+    assert world_map.last_location is None